@@ -20,6 +20,13 @@ class Activation(Layer):
     """
     Default activation, that all other activations inherit
 
+    During training forward keeps only what backward needs (see cache), by default the inputs.
+    Backward writes the gradient into a buffer that is reused between steps, built-in activations
+    compute it in place with ufuncs from their cached outputs or masks, without temporary arrays.
+
+    Gradients are not checked for nan and inf, set ``Activation.debug = True``
+    to replace them with finite numbers while looking for numerical problems.
+
     Example::
 
        class CustomActivation(Activation):
@@ -29,9 +36,12 @@ class Activation(Layer):
                 ...
 
             # forward and backward methods should not be touched (unless you know what you are doing)
+            # cache and derivative can be overriden to avoid computing f_prime from the inputs
             
     """
 
+    debug = False
+
     def __init__(self, f: F, f_prime: F, *argv) -> None:
         """
         Initializes the object.
@@ -50,6 +60,10 @@ class Activation(Layer):
         self.f_prime = f_prime
         self.argv = argv
 
+        self.inputs = None
+        self.outputs = None
+        self.mask = None
+
     def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
         """ 
         Called each time the data passes throughout the nework.
@@ -63,17 +77,98 @@ class Activation(Layer):
         
         """
 
+        if len(self.argv) != 0:
+            outputs = self.f(inputs, self.argv)
+        else:
+            outputs = self.f(inputs)
+
+        self.inputs = self.outputs = self.mask = None
+
+        if training:
+            self.cache(inputs, outputs)
+
+        return outputs
+
+    def forward_inplace(self, inputs: Tensor, training: bool = False) -> Tensor:
+        """
+        Same as forward, but outputs are written over inputs when the activation supports it (see apply_inplace).
+
+        Used by layers that own their outputs, like :obj:`Dense`.
+
+        Args:
+            inputs (:obj:`Tensor`): output from the previous layer, overwritten
+            training (bool, optional): set to true during training, and is false when network predicts
+
+        Returns:
+            :obj:`Tensor`: f(inputs), inputs itself if it was computed in place
+        
+        """
+
+        outputs = self.apply_inplace(inputs)
+
+        if outputs is None:
+            return self.forward(inputs, training)
+
+        self.inputs = self.outputs = self.mask = None
+
+        # inputs are gone, activations computed in place cache only from outputs
+        if training:
+            self.cache(None, outputs)
+
+        return outputs
+
+    def apply_inplace(self, x: Tensor) -> Tensor:
+        """
+        Overwrites x with f(x).
+
+        Activations that implement it have to cache everything backward needs from the outputs.
+
+        Args:
+            x (:obj:`Tensor`): inputs of the activation
+
+        Returns:
+            :obj:`Tensor`: x, or None if the activation can't be computed in place
+
+        """
+
+        return None
+
+    def cache(self, inputs: Tensor, outputs: Tensor) -> None:
+        """
+        Keeps what backward needs, called by forward during training.
+
+        Stores inputs, activations that can compute their derivation from the outputs (or a mask)
+        store that instead, in outputs (or mask).
+
+        Args:
+            inputs (:obj:`Tensor`): inputs of the activation
+            outputs (:obj:`Tensor`): f(inputs)
+
+        """
+
         self.inputs = inputs
 
-        if len(self.argv) != 0:
-            return self.f(inputs, self.argv)
+    def derivative(self, grad: Tensor, out: Tensor) -> None:
+        """
+        Writes f_prime(inputs) * grad into out.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+            out (:obj:`Tensor`): buffer of the same shape as grad
 
-        return self.f(inputs)
+        """
+
+        if len(self.argv) != 0:
+            np.multiply(self.f_prime(self.inputs, self.argv), grad, out=out)
+        else:
+            np.multiply(self.f_prime(self.inputs), grad, out=out)
 
     def backward(self, grad: Tensor) -> Tensor:
         """
         Used to calculate the gradients of weights and biases.
 
+        Gradient is written into a buffer reused between steps, so it is only valid until the next backward.
+
         Args:
             grad (:obj:`Tensor`): gradient from previous layer or loss function.
 
@@ -82,10 +177,21 @@ class Activation(Layer):
 
         """
 
-        if len(self.argv) != 0:
-            return utl.fix_overflow(self.f_prime(self.inputs, self.argv) * grad)
+        cached = next(x for x in (self.outputs, self.mask, self.inputs) if x is not None)
+        shape = np.broadcast(cached, grad).shape
+
+        out = self.grads.get('in')
+
+        if out is None or out.shape != shape or out.dtype != grad.dtype:
+            out = np.empty(shape, dtype=grad.dtype)
+            self.grads['in'] = out
+
+        self.derivative(grad, out)
+
+        if self.debug:
+            utl.fix_overflow(out, copy=False)
 
-        return utl.fix_overflow(self.f_prime(self.inputs) * grad)
+        return out
 
 
 # TO DO: Softplus, Softsign, SELU, ELU, exponential, leaky Relu
\ No newline at end of file
@@ -32,7 +32,7 @@ def leaky_relu(x: Tensor, alpha) -> Tensor:
         :obj:`Tensor`: f(x), applies activation function
     """
 
-    return np.maximum(x, x * alpha)
+    return np.maximum(x, x * np.asarray(alpha, dtype=x.dtype))
 
 def leaky_relu_prime(x: Tensor, alpha) -> Tensor:
     """
@@ -51,9 +51,7 @@ def leaky_relu_prime(x: Tensor, alpha) -> Tensor:
         :obj:`Tensor`: f'(x), applies derivation of activation function
     """
 
-    x[x > 0] = 1
-    x[x < 0] = alpha
-    return x
+    return np.where(x > 0, 1, np.asarray(alpha, dtype=x.dtype)).astype(x.dtype)
 
 class LeakyRelu(Activation):
     """
@@ -66,6 +64,8 @@ class LeakyRelu(Activation):
     It is important to note that leaky relu activation works only with small variances,
     so weights should be initializes with a weight initializes that does that.
 
+    During training only a boolean mask of positive inputs is kept.
+
     Example::
 
         leaky_relu = LeakyRelu()
@@ -78,6 +78,50 @@ class LeakyRelu(Activation):
 
     def __init__(self, alpha: float = 0):
         """
+        Initializes the object.
+
+        Args:
+            alpha (float, optional): slope for negative inputs, defaults to 0
+
+        """
+        super().__init__(leaky_relu, leaky_relu_prime, alpha)
 
+    def cache(self, inputs: Tensor, outputs: Tensor) -> None:
         """
-        super().__init__(leaky_relu, leaky_relu_prime, alpha)
\ No newline at end of file
+        Keeps the mask of positive inputs.
+
+        Args:
+            inputs (:obj:`Tensor`): inputs of the activation
+            outputs (:obj:`Tensor`): f(inputs)
+
+        """
+
+        # alpha is not negative, so outputs are positive exactly where inputs are
+        self.mask = outputs > 0
+
+    def apply_inplace(self, x: Tensor) -> Tensor:
+        """
+        Overwrites x with f(x).
+
+        Args:
+            x (:obj:`Tensor`): inputs of the activation
+
+        Returns:
+            :obj:`Tensor`: x
+
+        """
+
+        return np.multiply(x, self.argv[0], out=x, where=x < 0)
+
+    def derivative(self, grad: Tensor, out: Tensor) -> None:
+        """
+        Writes grad where inputs were positive and alpha * grad elsewhere into out.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+            out (:obj:`Tensor`): buffer of the same shape as grad
+
+        """
+
+        np.multiply(grad, self.argv[0], out=out)
+        np.copyto(out, grad, where=self.mask)
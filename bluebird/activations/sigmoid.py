@@ -34,7 +34,7 @@ def sigmoid_prime(x: Tensor) -> Tensor:
     Derivation of the sigmoid activation function.
 
     derivation:
-        f'(x) = f(x) * (1 - f(x))
+        f'(x) = f(x) * (f(x) - 1)
 
     Args:
         x (:obj:`Tensor`): input to the function
@@ -43,7 +43,9 @@ def sigmoid_prime(x: Tensor) -> Tensor:
         :obj:`Tensor`: f'(x), applies derivation of activation function
     """
 
-    return sigmoid(x) * (sigmoid(x) - 1)
+    y = sigmoid(x)
+
+    return y * (y - 1)
 
 class Sigmoid(Activation):
     """
@@ -53,6 +55,8 @@ class Sigmoid(Activation):
 
     Only functions are specified, which you can see in previous page.
 
+    Derivation is computed from the outputs, which are kept during training.
+
     Example::
 
         sigmoid = Sigmoid()
@@ -64,4 +68,46 @@ class Sigmoid(Activation):
     """
 
     def __init__(self):
-        super().__init__(sigmoid, sigmoid_prime)
\ No newline at end of file
+        super().__init__(sigmoid, sigmoid_prime)
+
+    def cache(self, inputs: Tensor, outputs: Tensor) -> None:
+        """
+        Keeps the outputs.
+
+        Args:
+            inputs (:obj:`Tensor`): inputs of the activation
+            outputs (:obj:`Tensor`): f(inputs)
+
+        """
+
+        self.outputs = outputs
+
+    def apply_inplace(self, x: Tensor) -> Tensor:
+        """
+        Overwrites x with f(x).
+
+        Args:
+            x (:obj:`Tensor`): inputs of the activation
+
+        Returns:
+            :obj:`Tensor`: x
+
+        """
+
+        np.exp(x, out=x)
+        x += 1
+        return np.reciprocal(x, out=x)
+
+    def derivative(self, grad: Tensor, out: Tensor) -> None:
+        """
+        Writes f(x) * (f(x) - 1) * grad into out.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+            out (:obj:`Tensor`): buffer of the same shape as grad
+
+        """
+
+        np.subtract(self.outputs, 1, out=out)
+        out *= self.outputs
+        out *= grad
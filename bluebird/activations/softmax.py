@@ -59,6 +59,8 @@ class Softmax(Activation):
 
     Only functions are specified, which you can see in previous page.
 
+    Derivation is computed from the outputs, which are kept during training.
+
     Example::
 
         softmax = Softmax()
@@ -70,4 +72,47 @@ class Softmax(Activation):
     """
 
     def __init__(self):
-        super().__init__(softmax, softmax_prime)
\ No newline at end of file
+        super().__init__(softmax, softmax_prime)
+
+    def cache(self, inputs: Tensor, outputs: Tensor) -> None:
+        """
+        Keeps the outputs.
+
+        Args:
+            inputs (:obj:`Tensor`): inputs of the activation
+            outputs (:obj:`Tensor`): f(inputs)
+
+        """
+
+        self.outputs = outputs
+
+    def apply_inplace(self, x: Tensor) -> Tensor:
+        """
+        Overwrites x with f(x).
+
+        Args:
+            x (:obj:`Tensor`): inputs of the activation
+
+        Returns:
+            :obj:`Tensor`: x
+
+        """
+
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True) + 1e-8
+        return x
+
+    def derivative(self, grad: Tensor, out: Tensor) -> None:
+        """
+        Writes f(x) * (1 - f(x)) * grad into out.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+            out (:obj:`Tensor`): buffer of the same shape as grad
+
+        """
+
+        np.subtract(1, self.outputs, out=out)
+        out *= self.outputs
+        out *= grad
@@ -47,7 +47,6 @@ def softplus_prime(x):
     """
 
     exp = np.exp(-(x - x.max(axis=1, keepdims=True)))
-    print(exp)
     return 1 / (1 + exp)
 
 class Softplus(Activation):
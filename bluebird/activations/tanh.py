@@ -55,6 +55,8 @@ class Tanh(Activation):
 
     Only functions are specified, which you can see in previous page.
 
+    Derivation is computed from the outputs, which are kept during training.
+
     Example::
 
         tanh = Tanh()
@@ -67,3 +69,43 @@ class Tanh(Activation):
 
     def __init__(self):
         super().__init__(tanh, tanh_prime)
+
+    def cache(self, inputs: Tensor, outputs: Tensor) -> None:
+        """
+        Keeps the outputs.
+
+        Args:
+            inputs (:obj:`Tensor`): inputs of the activation
+            outputs (:obj:`Tensor`): f(inputs)
+
+        """
+
+        self.outputs = outputs
+
+    def apply_inplace(self, x: Tensor) -> Tensor:
+        """
+        Overwrites x with f(x).
+
+        Args:
+            x (:obj:`Tensor`): inputs of the activation
+
+        Returns:
+            :obj:`Tensor`: x
+
+        """
+
+        return np.tanh(x, out=x)
+
+    def derivative(self, grad: Tensor, out: Tensor) -> None:
+        """
+        Writes (1 - f(x)^2) * grad into out.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+            out (:obj:`Tensor`): buffer of the same shape as grad
+
+        """
+
+        np.multiply(self.outputs, self.outputs, out=out)
+        np.subtract(1, out, out=out)
+        out *= grad
@@ -0,0 +1,295 @@
+"""
+Checkpoint
+==========
+
+Binary format used to save and load parameters of a model.
+
+File starts with a small json header describing every parameter (layer, name, dtype, shape and offset),
+followed by raw contiguous buffers of the parameters.
+Buffers of layers (state that isn't trained, like running statistics) are saved the same way as params.
+Every buffer starts at a multiple of 64 bytes, so it can be read directly into an array,
+or mapped into memory without copying.
+
+.. code-block::
+
+    BLUEBIRD | version (uint32) | header length (uint64) | json header | padding | data ...
+
+Same format stores named arrays that don't belong to layers, like the state of an optimizer.
+
+Example::
+
+    save_layers('model.bb', net.layers)
+    load_layers('model.bb', net.layers)
+
+    save_arrays('optimizer.bb', optimizer.state_dict())
+    optimizer.load_state_dict(load_arrays('optimizer.bb'))
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .layers import Layer
+
+MAGIC = b'BLUEBIRD'
+VERSION = 1
+ALIGNMENT = 64
+
+PREFIX = struct.Struct('<IQ')
+
+GROUPS = ('params', 'buffers')
+
+
+def align(offset: int) -> int:
+    """
+    Rounds the offset up to the alignment.
+
+    Args:
+        offset (int): position in bytes
+
+    Returns:
+        int: aligned position
+    """
+
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def is_checkpoint(path: str) -> bool:
+    """
+    Checks if the file is saved in binary checkpoint format.
+
+    Args:
+        path (:obj:`str`): path to the file
+
+    Returns:
+        bool: True if file starts with checkpoint magic bytes
+    """
+
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_header(f) -> Tuple[dict, int]:
+    """
+    Reads the header of the checkpoint.
+
+    Args:
+        f (file): file opened in binary mode, positioned at the start
+
+    Returns:
+        Tuple[dict, int]: header and the position where data starts
+    """
+
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("File is not a bluebird checkpoint")
+
+    version, length = PREFIX.unpack(f.read(PREFIX.size))
+
+    if version > VERSION:
+        raise ValueError(f"Checkpoint version {version} is not supported")
+
+    header = json.loads(f.read(length).decode('utf-8'))
+
+    return header, align(len(MAGIC) + PREFIX.size + length)
+
+
+def describe(name: str, value: np.ndarray, offset: int) -> dict:
+    """
+    Creates the header entry of an array.
+
+    Args:
+        name (:obj:`str`): name of the array
+        value (np.ndarray): contiguous array
+        offset (int): aligned position of the array data
+
+    Returns:
+        dict: header entry
+    """
+
+    return {
+        'name': name,
+        'dtype': value.dtype.str,
+        'shape': list(value.shape),
+        'offset': offset
+    }
+
+
+def write(path: str, header: dict, tensors: List[Tuple[int, np.ndarray]]) -> None:
+    """
+    Writes the header and raw data of arrays to a file.
+
+    Data is written to a temporary file next to it, which then replaces the file.
+    Arrays mapped from the old file (see load_layers) stay valid, and a failed write doesn't leave a truncated file.
+
+    Args:
+        path (:obj:`str`): path to the file
+        header (dict): json serializable header
+        tensors (List[Tuple[int, np.ndarray]]): offsets and contiguous arrays
+    """
+
+    header = json.dumps(header).encode('utf-8')
+    start = align(len(MAGIC) + PREFIX.size + len(header))
+
+    temp = path + '.tmp'
+
+    try:
+        with open(temp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(PREFIX.pack(VERSION, len(header)))
+            f.write(header)
+
+            for offset, value in tensors:
+                f.write(b'\0' * (start + offset - f.tell()))
+                f.write(value.data)
+
+        os.replace(temp, path)
+    except BaseException:
+        # open itself can fail, then there is no file to remove and the original error is raised
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def save_layers(path: str, layers: Sequence[Layer]) -> None:
+    """
+    Saves params and buffers of every layer to a file.
+
+    Each parameter is written with a single write, without converting it.
+
+    Args:
+        path (:obj:`str`): path to the file
+        layers (Sequence[Layer]): layers of the model
+    """
+
+    entries = []
+    tensors = []
+    offset = 0
+
+    for layer in layers:
+        entry = {'name': type(layer).__name__}
+
+        for group in GROUPS:
+            entry[group] = []
+
+            for key, value in getattr(layer, group, {}).items():
+                value = np.ascontiguousarray(value)
+                offset = align(offset)
+
+                entry[group].append(describe(key, value, offset))
+                tensors.append((offset, value))
+
+                offset += value.nbytes
+
+        entries.append(entry)
+
+    write(path, {'layers': entries}, tensors)
+
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Saves named arrays to a file.
+
+    Args:
+        path (:obj:`str`): path to the file
+        arrays (Dict[str, np.ndarray]): arrays to save
+    """
+
+    entries = []
+    tensors = []
+    offset = 0
+
+    for key, value in arrays.items():
+        value = np.asarray(value, order='C')
+        offset = align(offset)
+
+        entries.append(describe(key, value, offset))
+        tensors.append((offset, value))
+
+        offset += value.nbytes
+
+    write(path, {'arrays': entries}, tensors)
+
+
+def load_arrays(path: str) -> Dict[str, np.ndarray]:
+    """
+    Loads arrays saved with save_arrays.
+
+    Args:
+        path (:obj:`str`): path to the file
+
+    Returns:
+        Dict[str, np.ndarray]: loaded arrays
+    """
+
+    arrays = {}
+
+    with open(path, 'rb') as f:
+        header, start = read_header(f)
+
+        for entry in header['arrays']:
+            shape = tuple(entry['shape'])
+            count = int(np.prod(shape))
+
+            f.seek(start + entry['offset'])
+            arrays[entry['name']] = np.fromfile(f, dtype=np.dtype(entry['dtype']), count=count).reshape(shape)
+
+    return arrays
+
+
+def load_layers(path: str, layers: Sequence[Layer], mmap_mode: bool = False) -> None:
+    """
+    Loads params and buffers saved with save_layers into the layers.
+
+    If the layer already has a parameter of the same shape and type, data is read directly into it,
+    otherwise a new array is created.
+
+    With mmap_mode the file is mapped read-only and params become views of the mapping,
+    nothing is read until the param is used, and processes loading the same file share its memory.
+    Mapped arrays are read-only, writing into them raises ValueError.
+
+    Args:
+        path (:obj:`str`): path to the file
+        layers (Sequence[Layer]): layers of the model, in the same order as when saved
+        mmap_mode (bool, optional): map params from the file instead of reading them, defaults to False
+    """
+
+    with open(path, 'rb') as f:
+        header, start = read_header(f)
+
+        if mmap_mode:
+            # arrays keep the mapping alive, it is closed when the last of them is gone
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            for loaded, layer in zip(header['layers'], layers):
+                for group in GROUPS:
+                    for param in loaded.get(group, []):
+                        dtype = np.dtype(param['dtype'])
+                        shape = tuple(param['shape'])
+                        count = int(np.prod(shape))
+
+                        getattr(layer, group)[param['name']] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                                                             offset=start + param['offset']).reshape(shape)
+            return
+
+        for loaded, layer in zip(header['layers'], layers):
+            for group in GROUPS:
+                arrays = getattr(layer, group)
+
+                for param in loaded.get(group, []):
+                    dtype = np.dtype(param['dtype'])
+                    shape = tuple(param['shape'])
+                    target = arrays.get(param['name'])
+
+                    f.seek(start + param['offset'])
+
+                    if isinstance(target, np.ndarray) and target.shape == shape and target.dtype == dtype \
+                            and target.flags.c_contiguous and target.flags.writeable:
+                        f.readinto(memoryview(target).cast('B'))
+                    else:
+                        count = int(np.prod(shape))
+                        arrays[param['name']] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
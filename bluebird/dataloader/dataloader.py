@@ -12,7 +12,8 @@ from bluebird.data import Batch
 from bluebird.tensor import Tensor
 
 class DataLoader(DataLoaderBase):
-    def __init__(self, inputs: Tensor, targets: Tensor, batch_size: int = 32, shuffle: bool = True):
+    def __init__(self, inputs: Tensor, targets: Tensor, batch_size: int = 32, shuffle: bool = True,
+                 num_workers: int = 0, prefetch: int = 2, seed: int = None):
         """
         Initalizes the object.
 
@@ -21,9 +22,12 @@ class DataLoader(DataLoaderBase):
             targets (:obj:`Tensor`): target data
             batch_size (int): length of every batch size, defaults to 32
             shuffle (bool): shuffles data if true, defaults to True
+            num_workers (int, optional): number of threads loading batches in background, defaults to 0
+            prefetch (int, optional): maximum number of batches loaded ahead, defaults to 2
+            seed (int, optional): seed for shuffling, defaults to None
 
         """
-        super().__init__(batch_size, shuffle)
+        super().__init__(batch_size, shuffle, num_workers, prefetch, seed)
 
         self.inputs = inputs
         self.targets = targets
@@ -5,12 +5,21 @@ DataLoader
 Data loader is a special class used for loading training data.
 
 It can also be used to load data direcly from folders or to create a custom loader to fit your every need.
+
+Batches can be loaded in background threads, so that loading and decoding overlaps with training::
+
+    loader = ImageLoader('images', targets, num_workers=4, prefetch=8)
 """
 
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from bluebird.data import DataIterator, Batch
 from bluebird.tensor import Tensor
+from bluebird.exceptions import TypeException
 from typing import Iterator
 
 class DataLoaderBase(DataIterator):
@@ -30,13 +39,16 @@ class DataLoaderBase(DataIterator):
                 return Batch(x, y)
     """
 
-    def __init__(self, batch_size: int = 32, shuffle: bool = True):
+    def __init__(self, batch_size: int = 32, shuffle: bool = True, num_workers: int = 0, prefetch: int = 2, seed: int = None):
         """
         Initalizes the object.
 
         Args:
             batch_size (int): length of every batch size, defaults to 32
             shuffle (bool): shuffles data if true, defaults to True
+            num_workers (int, optional): number of threads loading batches in background, 0 loads them when needed, defaults to 0
+            prefetch (int, optional): number of batches loaded ahead, while the current one is used, defaults to 2
+            seed (int, optional): seed for shuffling, same seed gives the same order of batches, defaults to None
 
         """
         super().__init__()
@@ -47,8 +59,17 @@ class DataLoaderBase(DataIterator):
         if not isinstance(shuffle, int):
             raise TypeException("shuffle", "int")
 
+        if not isinstance(num_workers, int):
+            raise TypeException("num_workers", "int")
+
+        if not isinstance(prefetch, int):
+            raise TypeException("prefetch", "int")
+
         self.batch_size = batch_size
         self.shuffle = shuffle
+        self.num_workers = num_workers
+        self.prefetch = max(1, prefetch)
+        self.random = np.random if seed is None else np.random.RandomState(seed)
 
     def __len__(self) -> int:
         """
@@ -85,7 +106,24 @@ class DataLoaderBase(DataIterator):
         idxes = np.arange(0, self.__len__(), self.batch_size)
 
         if self.shuffle:
-            np.random.shuffle(idxes)
+            self.random.shuffle(idxes)
+
+        if self.num_workers == 0:
+            for idx in idxes:
+                yield self.__getitem__(idx)
+            return
+
+        # batches are yielded in submission order, so the order doesn't depend on the threads
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            idxes = iter(idxes)
+            pending = deque(pool.submit(self.__getitem__, idx) for idx in islice(idxes, self.prefetch))
+
+            while pending:
+                batch = pending.popleft().result()
+
+                # next batch is submitted before yielding, so prefetch batches load while this one is used
+                idx = next(idxes, None)
+                if idx is not None:
+                    pending.append(pool.submit(self.__getitem__, idx))
 
-        for idx in idxes:
-            yield self.__getitem__(idx)
+                yield batch
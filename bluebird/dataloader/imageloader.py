@@ -25,7 +25,8 @@ from bluebird.data import Batch
 from bluebird.tensor import Tensor
 
 class ImageLoader(DataLoaderBase):
-    def __init__(self, image_dir: str, targets: Tensor, channels: int = 3, im_shape: tuple = None, batch_size: int = 32, shuffle: bool = True):
+    def __init__(self, image_dir: str, targets: Tensor, channels: int = 3, im_shape: tuple = None, batch_size: int = 32, shuffle: bool = True,
+                 num_workers: int = 0, prefetch: int = 2, seed: int = None):
         """
         Initalizes the object.
 
@@ -36,9 +37,12 @@ class ImageLoader(DataLoaderBase):
             im_shape (tuple, optional): define if you want to reshape the image, None = default image shape
             batch_size (int, optional): length of every batch size, defaults to 32
             shuffle (bool, optional): shuffles data if true, defaults to True
+            num_workers (int, optional): number of threads loading and decoding images in background, defaults to 0
+            prefetch (int, optional): maximum number of batches loaded ahead, defaults to 2
+            seed (int, optional): seed for shuffling, defaults to None
 
         """
-        super().__init__(batch_size, shuffle)
+        super().__init__(batch_size, shuffle, num_workers, prefetch, seed)
 
         self.image_dir = image_dir
         self.targets = targets
@@ -77,7 +81,7 @@ class ImageLoader(DataLoaderBase):
             i = i.convert(self.mode)
 
             if self.im_shape != None:
-                i = i.resize(self.im_shape, Image.ANTIALIAS)
+                i = i.resize(self.im_shape, Image.LANCZOS)
 
             i = np.array(i)
 
@@ -12,6 +12,7 @@ from .linear import Linear
 from .dense import Dense
 from .flatten import Flatten
 from .dropout import Dropout
+from .spatialdropout import SpatialDropout
 from .batchnormalization import BatchNormalization
 from .conv2d import Conv2D
 from .maxpool2d import MaxPool2D
\ No newline at end of file
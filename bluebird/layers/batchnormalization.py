@@ -23,6 +23,9 @@ class BatchNormalization(Layer):
     input = (input - mean) / variance
     output = input * weights + bias
 
+    Statistics are computed over all the axes except the last one (features, or channels of a convolution).
+    During training running mean and variance are tracked, and used when network predicts.
+
     Example::
 
         batch = BatchNormalization()
@@ -33,15 +36,17 @@ class BatchNormalization(Layer):
             ])
     """
 
-    def __init__(self, eps: float = 1e-8) -> None:
+    def __init__(self, eps: float = 1e-8, momentum: float = 0.9) -> None:
         """Initializes the object.
         
         Args:
             eps (float, optional): prevents division by zero, defaults to 1e-8
+            momentum (float, optional): how much of running statistics is kept after each training step, defaults to 0.9
         """
         
         super().__init__()
         self.eps = eps
+        self.momentum = momentum
         self.__class__.__name__ = "BatchNorm"
 
 
@@ -65,6 +70,24 @@ class BatchNormalization(Layer):
         self.params["w"] = gama_init.init((self.input_size,))
         self.params["b"] = beta_init.init((self.output_size,))
 
+        self.buffers["mean"] = np.zeros((self.input_size,))
+        self.buffers["var"] = np.ones((self.input_size,))
+
+    def scale_and_shift(self) -> tuple:
+        """
+        Folds weights, biases and running statistics into a single scale and shift.
+
+        output = input * scale + shift
+
+        Returns:
+            tuple: scale and shift
+        """
+
+        scale = self.params['w'] / np.sqrt(self.buffers['var'] + self.eps)
+        shift = self.params['b'] - self.buffers['mean'] * scale
+
+        return scale, shift
+
     def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
         """
         Called each time the data passes throughout the nework.
@@ -78,14 +101,42 @@ class BatchNormalization(Layer):
         
         """
 
+        if not training:
+            self.inputs = self.norm = None
+
+            scale, shift = self.scale_and_shift()
+            return inputs * scale.astype(inputs.dtype, copy=False) + shift.astype(inputs.dtype, copy=False)
+
         self.inputs = inputs
 
-        self.mean = np.mean(inputs, axis=0)
-        self.var = np.var(inputs, axis=0)
+        axes = tuple(range(inputs.ndim - 1))
+        self.mean = np.mean(inputs, axis=axes)
+        self.var = np.var(inputs, axis=axes)
 
         self.norm = (inputs - self.mean) / np.sqrt(self.var + self.eps)
 
-        return self.params['w'] * inputs + self.params['b']
+        self.update_statistics(inputs.size // inputs.shape[-1])
+
+        return self.params['w'] * self.norm + self.params['b']
+
+    def update_statistics(self, m: int) -> None:
+        """
+        Moves running statistics towards the statistics of the current batch.
+
+        Args:
+            m (int): number of values each statistic was computed from
+
+        """
+
+        for name, value in (('mean', self.mean), ('var', self.var * m / max(m - 1, 1))):
+            running = self.buffers[name]
+
+            if running.dtype != value.dtype:
+                running = running.astype(value.dtype)
+                self.buffers[name] = running
+
+            running *= self.momentum
+            running += (1 - self.momentum) * value
 
     def backward(self, grad: Tensor) -> Tensor:
         """
@@ -99,16 +150,18 @@ class BatchNormalization(Layer):
 
         """
 
-        m = self.inputs.shape[0]
+        axes = tuple(range(grad.ndim - 1))
+        m = grad.size // grad.shape[-1]
         mu = self.inputs - self.mean
         std_inv = 1.0 / np.sqrt(self.var + self.eps)
 
         d_norm = grad * self.params['w']
-        d_var = np.sum(d_norm * mu, axis=0) * (-0.5) * std_inv**3
-        d_mu = np.sum(d_norm * (-std_inv), axis=0) + d_var * np.mean(-2 * mu, axis=0)
+        d_var = np.sum(d_norm * mu, axis=axes) * (-0.5) * std_inv**3
+        d_mu = np.sum(d_norm * (-std_inv), axis=axes) + d_var * np.mean(-2 * mu, axis=axes)
 
-        self.grads['w'] = np.sum(grad * self.norm, axis=0)
-        self.grads['b'] = np.sum(grad, axis=0)
+        dtype = np.result_type(grad, self.norm)
 
-        return d_norm * std_inv + d_var * 2 * mu / m + d_mu / m
+        self.grads['w'] = np.sum(grad * self.norm, axis=axes, out=self.grad_buffer('w', dtype))
+        self.grads['b'] = np.sum(grad, axis=axes, out=self.grad_buffer('b', dtype))
 
+        return d_norm * std_inv + d_var * 2 * mu / m + d_mu / m
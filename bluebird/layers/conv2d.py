@@ -3,9 +3,20 @@
 ====================
 
 Convolution layers are used to develop convolutional neural netowrks that are most commonly used to analyze images.
+
+Forward pass can be computed with one of several algorithms:
+    * im2col: unrolls the windows and computes the output with a single matrix multiplication
+    * fft: multiplies the input and kernels in the frequency domain, good for large kernels
+    * winograd: Winograd F(2x2, 3x3), needs fewer multiplications, only for kernel_size=3 and stride=1
+    * auto: times the options on the first batch and remembers the fastest for each input shape
 """
 
+from typing import Tuple
+
+import time
+
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
 from bluebird.tensor import Tensor
 from bluebird.weight_initializers import  ZerosWeightInitializer, HeWeightInitializer
@@ -13,13 +24,27 @@ import bluebird.utils as utl
 
 from .layer import Layer
 
+# Winograd F(2x2, 3x3) transforms
+WINOGRAD_BT = np.array([[1, 0, -1, 0],
+                        [0, 1, 1, 0],
+                        [0, -1, 1, 0],
+                        [0, 1, 0, -1]], dtype=float)
+
+WINOGRAD_G = np.array([[1, 0, 0],
+                       [0.5, 0.5, 0.5],
+                       [0.5, -0.5, 0.5],
+                       [0, 0, 1]], dtype=float)
+
+WINOGRAD_AT = np.array([[1, 1, 1, 0],
+                        [0, 1, -1, -1]], dtype=float)
+
 class Conv2D(Layer):
     """
     Applies a 2D convolution over and input.
 
     Example::
 
-        conv = Conv2D(32, kernel_size=5)
+        conv = Conv2D(32, kernel_size=5, algo='auto')
         net = NeuralNet([
                 ...
                 conv,
@@ -27,7 +52,9 @@ class Conv2D(Layer):
             ])
     """
 
-    def __init__(self, out_channels: int, kernel_size: int = 3, stride: int = 1, padding: bool = True):
+    algorithms = ('im2col', 'fft', 'winograd', 'auto')
+
+    def __init__(self, out_channels: int, kernel_size: int = 3, stride: int = 1, padding: bool = True, algo: str = 'im2col'):
         """
         Initializes the object.
 
@@ -36,13 +63,23 @@ class Conv2D(Layer):
             kernel_size (int, optional): size of the window, defaults to 3
             stride (int, optional): determens how much the filter moves, defaults to 1
             padding (bool, optional): True if you want to add padding to the input image, defualts to True 
+            algo (str, optional): algorithm used in forward pass, one of 'im2col', 'fft', 'winograd' or 'auto', defaults to 'im2col'
         """
 
+        if algo not in self.algorithms:
+            raise ValueError(f"algo should be one of {self.algorithms}")
+
+        if algo == 'winograd' and (kernel_size != 3 or stride != 1):
+            raise ValueError("winograd works only with kernel_size=3 and stride=1")
+
         super().__init__()
         self.output_size = out_channels
         self.kernel_size = kernel_size
         self.stride = stride
         self.padding = padding
+        self.algo = algo
+        self.algo_cache = {}
+        self.workspace = {}
 
     def build(self, in_channels: int):
         """
@@ -60,12 +97,17 @@ class Conv2D(Layer):
         self.params["w"] = weight_initializer.init((self.kernel_size, self.kernel_size, self.input_size, self.output_size))
         self.params["b"] = bias_initializer.init((1, 1, 1, self.output_size))
 
-    def zero_padding(self, inp: Tensor) -> Tensor:
+    def zero_padding(self, inp: Tensor, training: bool = False) -> Tensor:
         """
         Add zero padding to the input Tensor.
 
+        During training padded buffer is allocated once for each input shape and reused by later batches,
+        only the inside is overwritten so the border stays zero.
+        When predicting every call gets its own buffer, so the layer can be used from several threads at once.
+
         Args:
             inputs (:obj:`Tensor`): input to the layer
+            training (bool, optional): reuse the buffer of the layer, defaults to False
 
         Returns
             :obj:`Tensor`: padded input
@@ -74,37 +116,271 @@ class Conv2D(Layer):
 
         pad_len = self.kernel_size - 1
         n, w, h, c = inp.shape
-        padded = np.zeros((n, w+2*pad_len, h+2*pad_len, c), dtype=inp.dtype)
-        padded[:, pad_len:-pad_len, pad_len:-pad_len, :] = inp
+
+        key = (inp.shape, inp.dtype)
+        padded = self.workspace.get(key) if training else None
+
+        if padded is None:
+            padded = np.zeros((n, w+2*pad_len, h+2*pad_len, c), dtype=inp.dtype)
+
+            if training:
+                self.workspace[key] = padded
+
+        padded[:, pad_len:pad_len+w, pad_len:pad_len+h, :] = inp
 
         return padded
 
-    def remove_zero_padding(self, inp: Tensor) -> Tensor:
+    def im2col(self, padded: Tensor) -> Tensor:
         """
-        Add zero padding to the input Tensor.
+        Unrolls every window of the input into a row of a matrix.
+
+        Windows are read through a strided view, so the only copy made is the returned matrix.
 
         Args:
-            inputs (:obj:`Tensor`): input to the layer
+            padded (:obj:`Tensor`): (padded) input to the layer, of shape (n, height, width, channels)
 
-        Returns
-            :obj:`Tensor`: padded input
+        Returns:
+            :obj:`Tensor`: matrix of shape (n * new_height * new_width, kernel_size * kernel_size * channels)
+
+        """
+
+        (n, height, width, channels) = padded.shape
+        f = self.kernel_size
+
+        new_height = (height - f) // self.stride + 1
+        new_width = (width - f) // self.stride + 1
+
+        (sn, sh, sw, sc) = padded.strides
+        windows = as_strided(padded,
+                             shape=(n, new_height, new_width, f, f, channels),
+                             strides=(sn, sh * self.stride, sw * self.stride, sh, sw, sc),
+                             writeable=False)
+
+        return windows.reshape(n * new_height * new_width, f * f * channels)
+
+    def col2im(self, cols: Tensor, shape: tuple) -> Tensor:
+        """
+        Inverse of im2col, sums every row of the matrix back into the window it came from.
+
+        Overlapping windows accumulate, which is exactly what the input gradient needs.
+        Parts of the windows that fall on the zero padding are skipped, so no padded buffer is needed.
+
+        Args:
+            cols (:obj:`Tensor`): matrix of shape (n * new_height * new_width, kernel_size * kernel_size * channels)
+            shape (tuple): shape of the input without padding, (n, height, width, channels)
+
+        Returns:
+            :obj:`Tensor`: Tensor of the given shape
+
+        """
+
+        (n, height, width, channels) = shape
+        f = self.kernel_size
+        s = self.stride
+        pad = f - 1 if self.padding else 0
+
+        new_height = (height + 2*pad - f) // s + 1
+        new_width = (width + 2*pad - f) // s + 1
+
+        cols = cols.reshape(n, new_height, new_width, f, f, channels)
+        out = np.zeros(shape, dtype=cols.dtype)
+
+        def window_range(offset: int, size: int, steps: int) -> tuple:
+            # windows whose element at offset lands inside the unpadded input
+            first = max(0, -(-(pad - offset) // s))
+            last = min(steps, (size - 1 + pad - offset) // s + 1)
+            return first, last, offset + s*first - pad
+
+        # loop only over kernel offsets, each one is a strided slice covering every window
+        for i in range(f):
+            (h_first, h_last, h_start) = window_range(i, height, new_height)
+            if h_first >= h_last:
+                continue
+
+            for j in range(f):
+                (w_first, w_last, w_start) = window_range(j, width, new_width)
+                if w_first >= w_last:
+                    continue
+
+                out[:, h_start:h_start + s*(h_last - h_first):s, w_start:w_start + s*(w_last - w_first):s, :] += \
+                    cols[:, h_first:h_last, w_first:w_last, i, j, :]
+
+        return out
+
+    def conv_im2col(self, padded: Tensor, training: bool = False) -> Tensor:
+        """
+        Convolution as a single matrix multiplication of unrolled windows and kernels.
+
+        During training unrolled windows are kept for the backward pass.
+
+        Args:
+            padded (:obj:`Tensor`): (padded) input to the layer
+            training (bool, optional): keep unrolled windows, defaults to False
+
+        Returns:
+            :obj:`Tensor`: convolved input, without bias
+
+        """
+
+        (n, height, width, channels) = padded.shape
+        (f, f, channels, out_channels) = self.params['w'].shape
+
+        new_height = (height - f) // self.stride + 1
+        new_width = (width - f) // self.stride + 1
+
+        # every output pixel is one row of the unrolled input, so the whole batch is a single matmul
+        cols = self.im2col(padded)
+        Z = np.dot(cols, self.params['w'].reshape(-1, out_channels))
+
+        if training:
+            self.cols = cols
+
+        return Z.reshape(n, new_height, new_width, out_channels)
+
+    def conv_fft(self, padded: Tensor) -> Tensor:
+        """
+        Convolution computed in the frequency domain.
+
+        Cost does not depend on the kernel size, so it pays off for large kernels.
+
+        Args:
+            padded (:obj:`Tensor`): (padded) input to the layer
+
+        Returns:
+            :obj:`Tensor`: convolved input, without bias
 
         """
-        pad = self.kernel_size - 1
-        return inp[pad:-pad, pad:-pad, :]
 
+        (n, height, width, channels) = padded.shape
+        f = self.kernel_size
 
-    def step(self, inp: Tensor, w: Tensor, b: Tensor) -> Tensor:
+        X = np.fft.rfft2(padded, axes=(1, 2))
+        K = np.fft.rfft2(self.params['w'], s=(height, width), axes=(0, 1))
+
+        # layer computes cross-correlation, which is multiplication with conjugated kernel spectrum
+        Y = np.einsum('nhwc,hwco->nhwo', X, np.conj(K), optimize=True)
+        Z = np.fft.irfft2(Y, s=(height, width), axes=(1, 2))
+
+        return Z[:, :height - f + 1:self.stride, :width - f + 1:self.stride, :].astype(padded.dtype, copy=False)
+
+    def conv_winograd(self, padded: Tensor) -> Tensor:
         """
-        Perform single step in convolution.
+        Convolution with Winograd F(2x2, 3x3) algorithm.
+
+        Each 2x2 output tile takes 16 multiplications per channel instead of 36.
 
         Args:
-            inp (:obj:`Tensor`): slice of input
-            w (:obj:`Tensor`): weights
-            b (:obj:`Tensor`): bias
+            padded (:obj:`Tensor`): (padded) input to the layer
+
+        Returns:
+            :obj:`Tensor`: convolved input, without bias
+
         """
 
-        return np.sum(inp * w) + b
+        (n, height, width, channels) = padded.shape
+        out_channels = self.output_size
+
+        new_height = height - 2
+        new_width = width - 2
+        tiles_h = -(-new_height // 2)
+        tiles_w = -(-new_width // 2)
+
+        # inputs tiles overlap by 2, pad so that every tile is complete
+        extra_h = 2 * tiles_h + 2 - height
+        extra_w = 2 * tiles_w + 2 - width
+        if extra_h or extra_w:
+            padded = np.pad(padded, ((0, 0), (0, extra_h), (0, extra_w), (0, 0)))
+
+        (sn, sh, sw, sc) = padded.strides
+        tiles = as_strided(padded,
+                           shape=(n, tiles_h, tiles_w, 4, 4, channels),
+                           strides=(sn, 2 * sh, 2 * sw, sh, sw, sc),
+                           writeable=False)
+
+        G = WINOGRAD_G.astype(padded.dtype)
+        BT = WINOGRAD_BT.astype(padded.dtype)
+        AT = WINOGRAD_AT.astype(padded.dtype)
+
+        U = np.einsum('ai,ijco,bj->abco', G, self.params['w'], G)
+        V = np.einsum('ai,nxyijc,bj->abnxyc', BT, tiles, BT, optimize=True)
+
+        # 16 independent matrix multiplications, one for each point of the transformed tile
+        M = np.matmul(V.reshape(16, -1, channels), U.reshape(16, channels, out_channels))
+        M = M.reshape(4, 4, n, tiles_h, tiles_w, out_channels)
+
+        Y = np.einsum('pa,abnxyo,qb->nxpyqo', AT, M, AT, optimize=True)
+        Y = Y.reshape(n, 2 * tiles_h, 2 * tiles_w, out_channels)
+
+        return Y[:, :new_height, :new_width, :]
+
+    def convolve(self, algo: str, padded: Tensor, training: bool = False) -> Tensor:
+        """
+        Runs the convolution with given algorithm.
+
+        Args:
+            algo (str): one of 'im2col', 'fft' or 'winograd'
+            padded (:obj:`Tensor`): (padded) input to the layer
+            training (bool, optional): keep what backward pass needs, defaults to False
+
+        Returns:
+            :obj:`Tensor`: convolved input, without bias
+
+        """
+
+        self.cols = None
+
+        if algo == 'fft':
+            return self.conv_fft(padded)
+
+        if algo == 'winograd':
+            return self.conv_winograd(padded)
+
+        return self.conv_im2col(padded, training)
+
+    def benchmark(self, padded: Tensor, training: bool = False, repeats: int = 3) -> Tuple[str, Tensor]:
+        """
+        Times every available algorithm on the input and caches the fastest one for its shape.
+
+        Each algorithm runs once untimed (allocations and caches warm up), then the best of several runs counts.
+        Output of the fastest algorithm is returned, so the input isn't convolved again.
+
+        Args:
+            padded (:obj:`Tensor`): (padded) input to the layer
+            training (bool, optional): keep what backward pass needs, defaults to False
+            repeats (int, optional): number of timed runs of each algorithm, defaults to 3
+
+        Returns:
+            Tuple[str, Tensor]: name of the fastest algorithm and its output, without bias
+
+        """
+
+        candidates = ['im2col', 'fft']
+
+        if self.kernel_size == 3 and self.stride == 1:
+            candidates.append('winograd')
+
+        timings = {}
+        outputs = {}
+        cols = {}
+
+        for algo in candidates:
+            self.convolve(algo, padded)
+
+            timings[algo] = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                outputs[algo] = self.convolve(algo, padded, training)
+                timings[algo] = min(timings[algo], time.perf_counter() - start)
+
+            cols[algo] = self.cols
+
+        best = min(timings, key=timings.get)
+        self.algo_cache[padded.shape] = best
+
+        # later candidates reset the unrolled windows, backward needs the ones of the chosen algorithm
+        self.cols = cols[best]
+
+        return best, outputs[best]
 
     def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
         """
@@ -119,45 +395,24 @@ class Conv2D(Layer):
         
         """
 
-        self.inputs = inputs
-
-        (n, height, width, channels) = inputs.shape
-        (f, f, channels, out_channels) = self.params['w'].shape
-
-        padding = self.kernel_size - 1
-        
-        new_height = int((height + 2*padding - f)/self.stride) + 1
-        new_width = int((width + 2*padding - f)/self.stride) + 1
-
-        Z = np.zeros((n, new_height, new_width, out_channels))
-
         padded = inputs
 
         if self.padding:
-            padded = self.zero_padding(inputs)
-
-        self.padded = padded
+            padded = self.zero_padding(inputs, training)
 
+        # nothing is kept for backward pass when predicting
+        self.inputs = inputs if training else None
+        self.padded = padded if training else None
 
-        # batch
-        for i in range(n):
-            inp = padded[i, :, :, :]
-            # height
-            for h in range(new_height):
-                # width
-                for w in range(new_width):
-                    # channel
-                    for c in range(out_channels):
-                        v_start = h * self.stride
-                        v_end = h * self.stride + f
-                        h_start = w * self.stride
-                        h_end = w * self.stride + f
+        algo = self.algo
 
-                        slic = inp[v_start:v_end, h_start:h_end, :]
+        if algo == 'auto':
+            algo = self.algo_cache.get(padded.shape)
+            if algo is None:
+                _, outputs = self.benchmark(padded, training)
+                return outputs + self.params['b']
 
-                        Z[i, h, w, c] = self.step(slic, self.params['w'][:, :, :, c], self.params['b'][:, :, :, c])
-
-        return Z
+        return self.convolve(algo, padded, training) + self.params['b']
 
     def backward(self, grad: Tensor) -> Tensor:
         """
@@ -171,37 +426,29 @@ class Conv2D(Layer):
 
         """
         
-        (n, height_prev, width_prev, channels_prev) = self.inputs.shape
-
         (f, f, channels_prev, channels) = self.params['w'].shape
 
-        (n, height, width, channels) = grad.shape
+        grad = grad.reshape(-1, channels)
 
-        self.grads['in'] = np.zeros((n, height_prev, width_prev, channels_prev))
-        self.grads['w'] = np.zeros((f, f, channels_prev, channels))
-        self.grads['b'] = np.zeros((1, 1, 1, channels))
+        # fft and winograd don't unroll the input, backward always works with im2col
+        if self.cols is None:
+            self.cols = self.im2col(self.padded)
 
-        da_pad = np.zeros(self.padded.shape)
+        dtype = np.result_type(self.cols, grad)
+        dw = self.grad_buffer('w', dtype)
+        db = self.grad_buffer('b', dtype)
 
-        for i in range(n):
-            a = self.padded[i]
-            da = da_pad[i]
+        if dw is None:
+            self.grads['w'] = np.dot(self.cols.T, grad).reshape(f, f, channels_prev, channels)
+        else:
+            np.dot(self.cols.T, grad, out=dw.reshape(-1, channels))
 
-            for h in range(height):
-                for w in range(width):
-                    for c in range(channels):
-                        v_start = h
-                        v_end = v_start + f
-                        h_start = w
-                        h_end = h_start + f
+        if db is None:
+            self.grads['b'] = np.sum(grad, axis=0).reshape(1, 1, 1, channels)
+        else:
+            np.sum(grad, axis=0, out=db.reshape(channels))
 
-                        slic = a[v_start:v_end, h_start:h_end, :]
-
-                        da[v_start:v_end, h_start:h_end, :] += self.params['w'][:, :, :, c] * grad[i, h, w, c]
-                        self.grads['w'][:, :, :, c] += slic * grad[i, h, w, c]
-                        self.grads['b'][:, :, :, c] += grad[i, h, w, c]
-
-            self.grads['in'][i, :, :, :] = self.remove_zero_padding(da)
+        dcols = np.dot(grad, self.params['w'].reshape(-1, channels).T)
+        self.grads['in'] = self.col2im(dcols, self.inputs.shape)
 
         return self.grads['in']
-
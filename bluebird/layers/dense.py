@@ -35,6 +35,12 @@ class Dense(Layer):
 
     Also ihnerits the base Layer class.
 
+    Forward is fused: matrix multiplication writes into the output, bias is added to it
+    and the activation is applied to it in place (see :obj:`Activation.apply_inplace`).
+    During training the output buffer is allocated once for each input shape and reused by later batches,
+    so outputs of a training forward are only valid until the next one.
+    When predicting every call gets its own output, so the layer can be used from several threads at once.
+
     Example::
 
         dense = Dense(50, activation=Relu())
@@ -46,7 +52,7 @@ class Dense(Layer):
 
     """
 
-    def __init__(self, output_size: int, activation: 'Activation', 
+    def __init__(self, output_size: int, activation: 'Activation' = None, 
                  weight_initializer: WeightInitializer = HeWeightInitializer(),
                  bias_initializer: WeightInitializer = ZerosWeightInitializer()) -> None:
         """
@@ -54,7 +60,8 @@ class Dense(Layer):
 
         Args:
             output_size (int): dimension of the output
-            activation (:obj:`Activation`): activation function
+            activation (:obj:`Activation`, optional): activation function, None to output logits
+                (for example with :obj:`SoftmaxCrossEntropy`), defaults to None
             weight_initializer (:obj:`WeightInitializer`, optional): defines how weights are initialized, defaults to HeWeightInitializer
             bias_initializer (:obj:`WeightInitializer`, optional): defines how weights are initialized, defaults to ZerosWeightInitializer
 
@@ -74,10 +81,17 @@ class Dense(Layer):
 
         self.output_size = output_size
         self.hidden = activation
+        self.workspace = {}
 
         self.weight_initializer = weight_initializer
         self.bias_initializer = bias_initializer
 
+        # params are shared with the linear layer, so they can be loaded before the layer is built
+        self.layer = Linear(self.output_size, self.weight_initializer, self.bias_initializer)
+        self.params = self.layer.params
+        self.grads = self.layer.grads
+        self.buffers = self.layer.buffers
+
     def build(self, input_size: int) -> None:
         """
         Called by the model, before its training step.
@@ -89,12 +103,9 @@ class Dense(Layer):
 
         """
 
-        self.layer = Linear(self.output_size, self.weight_initializer, self.bias_initializer)
         self.layer.build(input_size)
         
         self.input_size = input_size
-        self.params = self.layer.params
-        self.grads = self.layer.grads
 
     def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
         """
@@ -109,14 +120,31 @@ class Dense(Layer):
         
         """
 
-        self.inputs = inputs
+        w = self.params["w"]
+        shape = inputs.shape[:-1] + w.shape[1:]
+        dtype = np.result_type(inputs, w)
+
+        key = (shape, dtype)
+        outputs = self.workspace.get(key) if training else None
+
+        if outputs is None:
+            outputs = np.empty(shape, dtype=dtype)
 
-        self.outputs = self.layer.forward(inputs, training)
+            if training:
+                self.workspace[key] = outputs
+
+        np.dot(inputs, w, out=outputs)
+        outputs += self.params["b"]
+
+        self.layer.inputs = inputs if training else None
 
         if self.hidden != None:
-            self.outputs = self.hidden.forward(self.outputs, training)
+            outputs = self.hidden.forward_inplace(outputs, training)
+
+        self.inputs = inputs if training else None
+        self.outputs = outputs if training else None
 
-        return self.outputs
+        return outputs
 
     def backward(self, grad: Tensor) -> Tensor:
         """
@@ -17,14 +17,37 @@ import bluebird.utils as utl
 from .layer import Layer
 from .linear import Linear
 
+def dropout_mask(random: np.random.Generator, shape: tuple, rate: float, dtype: np.dtype) -> Tensor:
+    """
+    Creates a Bernoulli mask, already multiplied by the scale of kept inputs.
+
+    Applying dropout is then a single multiplication with the mask, and the same mask is the gradient of dropout.
+
+    Args:
+        random (np.random.Generator): random number generator
+        shape (tuple): shape of the mask
+        rate (float): probability of dropping each element
+        dtype (np.dtype): type of the mask
+
+    Returns:
+        :obj:`Tensor`: mask with zeros for dropped elements and 1 / (1 - rate) for kept ones
+    """
+
+    dtype = np.dtype(dtype)
+    samples = random.random(shape, dtype=np.float32 if dtype == np.float32 else np.float64)
+
+    mask = np.greater_equal(samples, rate).astype(dtype)
+    mask *= 1 / (1 - rate)
+
+    return mask
+
+
 class Dropout(Linear):
     """
     Dropout ignores some of the inputs and scales other ones.
     Usefull to escape overfitting.
 
-    Inherits Linear layer, and changes only constructor and forward method.
-
-    Backward is the same as in Linear.
+    Inherits Linear layer, inputs are dropped before they are multiplied by weights.
 
     Example::
 
@@ -37,13 +60,14 @@ class Dropout(Linear):
 
     """
 
-    def __init__(self, output_size: int, droput_rate: float) -> None:
+    def __init__(self, output_size: int, droput_rate: float, seed: int = None) -> None:
         """
         Initializes the object.
 
         Args:
             output_size (int): dimension of the output 
             dropout_rate (float): percent of inputs the network ignores (1:=100%)
+            seed (int, optional): seed of the random generator, defaults to None
 
         """
 
@@ -55,6 +79,8 @@ class Dropout(Linear):
 
         super().__init__(output_size)
         self.droput_rate = droput_rate
+        self.random = np.random.default_rng(seed)
+        self.mask = None
 
     def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
         """
@@ -71,14 +97,31 @@ class Dropout(Linear):
         
         """
 
+        self.mask = None
+
         if training:
-            self.inputs = inputs / (1 - self.droput_rate)
-            indices = np.random.choice(np.arange(self.inputs.shape[1]), 
-                    replace=False,
-                    size=int(self.inputs.shape[1] * self.droput_rate))
-            z = np.zeros(inputs.shape[0])
-            for ind in indices:
-                self.inputs[:, ind] = 0
-        else:
-            self.inputs = inputs
-        return inputs @ self.params["w"] + self.params["b"]
+            self.mask = dropout_mask(self.random, inputs.shape, self.droput_rate, inputs.dtype)
+            inputs = inputs * self.mask
+
+        return super().forward(inputs, training)
+
+    def backward(self, grad: Tensor) -> Tensor:
+        """
+        Used to calculate the gradients of weights and biases.
+
+        Gradient of dropped inputs is zero, the rest is scaled, same as in forward pass.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+
+        Returns:
+            :obj:`Tensor`: Gradient
+
+        """
+
+        grad = super().backward(grad)
+
+        if self.mask is not None:
+            grad *= self.mask
+
+        return grad
@@ -72,12 +72,14 @@ class Flatten(Input):
         
         """
         
-        self.inputs = inputs.reshape(-1, self.output_size)
+        outputs = inputs.reshape(-1, self.output_size)
         
         if inputs.shape[1:] != self.input_size:
             raise TypeError("Invalid input shape")
 
-        return self.inputs
+        self.inputs = outputs if training else None
+
+        return outputs
 
     def backward(self, output: Tensor) -> Tensor:
         """
@@ -71,7 +71,7 @@ class Input(Layer):
         
         """
 
-        self.inputs = inputs
+        self.inputs = inputs if training else None
 
         return inputs
 
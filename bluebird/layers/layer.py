@@ -29,11 +29,18 @@ class Layer:
                 ... Make shoure you calculate gradients for weights and biases if needed
                 ... (self.grads['w'] and self.grads['b'])
 
+    When training is False, forward must not keep anything that later calls read,
+    so that a model can predict from several threads at once.
+
+    Params are trained by the optimizer, state that is not trained but should be saved
+    with the model (like running statistics) goes into self.buffers.
+
     """
 
     def __init__(self) -> None:
         self.params: Dict[str, Tensor] = {}
         self.grads: Dict[str, Tensor] = {}
+        self.buffers: Dict[str, Tensor] = {}
         self.train = True
         self.test = True
 
@@ -47,6 +54,29 @@ class Layer:
 
         return self.params
 
+    def grad_buffer(self, name: str, dtype: np.dtype) -> Tensor:
+        """
+        Returns the array the gradient of a param should be written into.
+
+        Model keeps all gradients as views of one flat buffer, layers pass it as out argument
+        instead of allocating new gradients each step.
+
+        Args:
+            name (str): name of the param
+            dtype (np.dtype): type of calculated gradient
+
+        Returns:
+            :obj:`Tensor`: gradient buffer, or None if there isn't a matching one
+
+        """
+
+        grad = self.grads.get(name)
+
+        if grad is None or grad.dtype != dtype or grad.shape != self.params[name].shape or not grad.flags.c_contiguous:
+            return None
+
+        return grad
+
     def build(self, input_size) -> None:
         """
         Used to finalize building layers.
@@ -95,5 +125,5 @@ class Layer:
 # TO DO: Masking, Lambda, Convolution (1D, 2D, 3D, Seperable, 
 # Depthwise, Transpose), Pooling (Max, Average, GlobalMax, 
 # GlobalAverage), Recurrent (LSTM, GRU, RNN), BatchNormalization,
-#  LayerNormalization, SpatialDropout, GaussianDropout,  
+#  LayerNormalization, GaussianDropout,  
 # 
\ No newline at end of file
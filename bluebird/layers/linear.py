@@ -89,13 +89,15 @@ class Linear(Layer):
         
         """
 
-        self.inputs = inputs
+        self.inputs = inputs if training else None
         return np.dot(inputs, self.params["w"]) + self.params["b"]
 
     def backward(self, grad: Tensor) -> Tensor:
         """
         Used to calculate the gradients of weights and biases.
 
+        Gradient of the inputs is written into a buffer reused between steps, so it is only valid until the next backward.
+
         Args:
             grad (:obj:`Tensor`): gradient from previous layer or loss function.
 
@@ -104,7 +106,18 @@ class Linear(Layer):
 
         """
 
-        self.grads["b"] = np.sum(grad, axis=0)
-        self.grads["w"] = np.dot(self.inputs.T, grad)
-        self.grads["in"] = np.dot(grad, self.params["w"].T)
-        return np.dot(grad, self.params["w"].T)
\ No newline at end of file
+        dtype = np.result_type(self.inputs, grad)
+
+        self.grads["b"] = np.sum(grad, axis=0, out=self.grad_buffer("b", dtype))
+        self.grads["w"] = np.dot(self.inputs.T, grad, out=self.grad_buffer("w", dtype))
+
+        w = self.params["w"]
+        shape = grad.shape[:-1] + w.shape[:1]
+        dtype = np.result_type(grad, w)
+
+        out = self.grads.get("in")
+        if out is None or out.shape != shape or out.dtype != dtype:
+            out = np.empty(shape, dtype=dtype)
+
+        self.grads["in"] = np.dot(grad, w.T, out=out)
+        return self.grads["in"]
\ No newline at end of file
@@ -8,6 +8,7 @@ Commonly used used in combination with 2D convolution layer.
 """
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
 from bluebird.tensor import Tensor
 import bluebird.utils as utl
@@ -58,54 +59,43 @@ class MaxPool2D(Layer):
         
         """
 
-        self.inputs = inputs
-
         (n, height, width, channels) = inputs.shape
         f = self.kernel_size
+        s = self.stride
         
-        new_height = int((height - f)/self.stride) + 1
-        new_width = int((width - f)/self.stride) + 1
-        out_channels = channels
-
-        Z = np.zeros((n, new_height, new_width, out_channels))
-
-        # batch
-        for i in range(n):
-            # height
-            for h in range(new_height):
-                # width
-                for w in range(new_width):
-                    # channel
-                    for c in range(out_channels):
-                        v_start = h * self.stride
-                        v_end = h * self.stride + f
-                        h_start = w * self.stride
-                        h_end = w * self.stride + f
-
-                        slic = inputs[i, v_start:v_end, h_start:h_end, c]
-                        
-                        Z[i, h, w, c] =  np.max(slic)
+        new_height = (height - f) // s + 1
+        new_width = (width - f) // s + 1
 
-        return Z
+        (sn, sh, sw, sc) = inputs.strides
+        windows = as_strided(inputs,
+                             shape=(n, new_height, new_width, f, f, channels),
+                             strides=(sn, sh * s, sw * s, sh, sw, sc),
+                             writeable=False)
+        windows = windows.reshape(n, new_height, new_width, f * f, channels)
 
-    def create_mask(self, a: Tensor) -> Tensor:
-        """
-        Creates the one hot max mask.
+        if not training:
+            self.inputs = self.argmax = None
+            return np.max(windows, axis=3)
 
-        Args:
-            a (:obj:`Tensor`): tensor you wish to create the mask from
+        self.inputs = inputs
 
-        Returns:
-            :obj:`Tensor`: mask
-        """
-        
-        return a.max() == a
+        arg = np.argmax(windows, axis=3)
+        Z = np.take_along_axis(windows, arg[:, :, :, np.newaxis, :], axis=3)[:, :, :, 0, :]
 
+        # position of every max inside the input, so backward is a single indexed add
+        i, h, w, c = np.indices(arg.shape, sparse=True)
+        rows = h * s + arg // f
+        cols = w * s + arg % f
+        self.argmax = np.ravel_multi_index((i, rows, cols, c), inputs.shape).ravel()
+
+        return Z
 
     def backward(self, grad: Tensor) -> Tensor:
         """
         Used to calculate the gradients of weights and biases.
 
+        Gradient is passed only to the inputs that were the max of their window.
+
         Args:
             grad (:obj:`Tensor`): gradient from previous layer or loss function.
 
@@ -114,30 +104,7 @@ class MaxPool2D(Layer):
 
         """
 
-        self.grads['in'] = np.zeros(self.inputs.shape)
-        f = self.kernel_size
-
-        (n, height_prev, width_prev, channels_prev) = self.inputs.shape
-        (n, height, width, channels) = grad.shape
-
-        for i in range(n):
-            a = self.inputs[i]
-            for h in range(height):
-                for w in range(width):
-                    for c in range(channels):
-                        v_start = h
-                        v_end = v_start + f
-                        h_start = w
-                        h_end = h_start + f
-
-                        slic = a[v_start:v_end, h_start:h_end, c]
-                        mask = self.create_mask(slic)
-
-                        self.grads['in'][i, v_start:v_end, h_start:h_end, c] += np.multiply(mask, grad[i, h, w, c])
+        da = np.bincount(self.argmax, weights=grad.ravel(), minlength=self.inputs.size)
+        self.grads['in'] = da.reshape(self.inputs.shape).astype(grad.dtype, copy=False)
 
         return self.grads['in']
-
-
-
-
-
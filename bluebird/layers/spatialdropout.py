@@ -0,0 +1,108 @@
+"""
+Spatial dropout layer
+=====================
+
+Dropout for convolutional features, it disables whole channels instead of single values.
+"""
+
+import numpy as np
+
+from bluebird.tensor import Tensor
+from bluebird.exceptions import TypeException
+
+from .layer import Layer
+from .dropout import dropout_mask
+
+class SpatialDropout(Layer):
+    """
+    Drops random channels of each sample, and scales other ones.
+
+    Neighbouring values in feature maps are strongly correlated, so dropping single values barely regularizes convolutions.
+    Expects inputs in (batch, height, width, channels) format, same as :obj:`Conv2D`.
+
+    Example::
+
+        dropout = SpatialDropout(0.2)
+        net = NeuralNet([
+                ...
+                Conv2D(16),
+                dropout,
+                ...
+            ])
+
+    """
+
+    def __init__(self, dropout_rate: float, seed: int = None) -> None:
+        """
+        Initializes the object.
+
+        Args:
+            dropout_rate (float): percent of channels the network ignores (1:=100%)
+            seed (int, optional): seed of the random generator, defaults to None
+
+        """
+
+        if not isinstance(dropout_rate, float):
+            raise TypeException("dropout_rate", "float")
+
+        super().__init__()
+        self.dropout_rate = dropout_rate
+        self.random = np.random.default_rng(seed)
+        self.mask = None
+
+    def build(self, input_size: int) -> None:
+        """
+        Called by the model, before its training step.
+
+        Args:
+            input_size (int): number of channels
+
+        """
+
+        self.input_size = input_size
+        self.output_size = input_size
+
+    def forward(self, inputs: Tensor, training: bool = False) -> Tensor:
+        """
+        Called each time the data passes throughout the nework.
+
+        Channels are disabled only during training.
+
+        Args:
+            inputs (:obj:`Tensor`): output from the previous layer
+            training (bool, optional): set to true during training, and is false when network predicts
+
+        Returns:
+            :obj:`Tensor`: processed input data
+        
+        """
+
+        self.mask = None
+
+        if not training:
+            return inputs
+
+        # one value per sample and channel, broadcasted over height and width
+        shape = (inputs.shape[0],) + (1,) * (inputs.ndim - 2) + (inputs.shape[-1],)
+        self.mask = dropout_mask(self.random, shape, self.dropout_rate, inputs.dtype)
+
+        return inputs * self.mask
+
+    def backward(self, grad: Tensor) -> Tensor:
+        """
+        Passes the gradient of kept channels.
+
+        Args:
+            grad (:obj:`Tensor`): gradient from previous layer or loss function.
+
+        Returns:
+            :obj:`Tensor`: Gradient
+
+        """
+
+        if self.mask is None:
+            return grad
+
+        self.grads['in'] = grad * self.mask
+
+        return self.grads['in']
@@ -10,4 +10,6 @@ Each optimization step fist starts by calculating the loss.
 
 from .loss import Loss
 from .categorical_cross_entropy import CategoricalCrossEntropy
+from .softmax_cross_entropy import SoftmaxCrossEntropy
+from .sparse_categorical_cross_entropy import SparseCategoricalCrossEntropy
 from .mse import MSE
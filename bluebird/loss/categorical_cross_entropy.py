@@ -7,6 +7,7 @@ Used for multi class classification.
 """
 
 import time
+from typing import Tuple
 
 import numpy as np
 
@@ -55,4 +56,28 @@ class CategoricalCrossEntropy(Loss):
 
         """
 
-        return predicted - actual
\ No newline at end of file
+        return predicted - actual
+
+    def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+        """
+        Calculates the loss and its gradient, using a single buffer.
+
+        Args:
+            predicted (:obj:`Tensor`): models output
+            actual (:obj:`Tensor`): expected output
+
+        Returns:
+            Tuple[float, Tensor]: loss and gradient
+
+        """
+
+        buffer = self.grad_buffer(np.broadcast(predicted, actual).shape, np.result_type(predicted, actual))
+
+        # the buffer holds log of predictions first, then it's overwritten by the gradient
+        np.log(predicted, out=buffer)
+        buffer *= actual
+        loss = - np.sum(buffer)
+
+        np.subtract(predicted, actual, out=buffer)
+
+        return loss, buffer
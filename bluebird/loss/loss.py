@@ -5,6 +5,8 @@ Loss
 Base loss class that all other losses inherit.
 """
 
+from typing import Tuple
+
 import numpy as np
 
 from bluebird.tensor import Tensor
@@ -22,6 +24,10 @@ class Loss:
             def grad(self, predicted: Tensor, actual: Tensor) -> float:
                 ... gradient of loss function
 
+            def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+                ... optional, both at once from shared intermediates,
+                ... gradient can be written into self.grad_buffer(shape, dtype)
+
     """
 
     def loss(self, predicted: Tensor, actual: Tensor) -> float:
@@ -55,8 +61,49 @@ class Loss:
         raise NotImplementedError
 
 
+    def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+        """
+        Calculates the loss and its gradient.
+
+        Used by the training step. By default it calls loss and grad,
+        losses override it to compute both in one pass.
+
+        Gradient may be written into a buffer that is reused by the next call, so it's valid only until then.
+
+        Args:
+            predicted (:obj:`Tensor`): models output
+            actual (:obj:`Tensor`): expected output
+
+        Returns:
+            Tuple[float, Tensor]: loss and gradient
+
+        """
+
+        return self.loss(predicted, actual), self.grad(predicted, actual)
+
+    def grad_buffer(self, shape: tuple, dtype: np.dtype) -> Tensor:
+        """
+        Returns the buffer gradient is written into, it's allocated again only when shape or type changes.
+
+        Args:
+            shape (tuple): shape of the gradient
+            dtype (np.dtype): type of the gradient
+
+        Returns:
+            :obj:`Tensor`: uninitialized buffer
+
+        """
+
+        buffer = getattr(self, 'buffer', None)
+
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffer = buffer
+
+        return buffer
+
+
 # TO DO: Accuracy, BinaryAccuracy, CategoricalAccuracy
-# SparseCategoricalCrossentropy, 
 # RMSE, MeanAbsErr, MeanSquaredLogErr
 # ACU, Precision, TruePositive, TrueNegative, FalsePositive,
 # FalseNegative, Hinge, Squared and Categorical Hinge,
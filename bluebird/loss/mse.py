@@ -5,6 +5,8 @@ Mean Squared Error
 Measures the averages of the squares of the errors.
 """
 
+from typing import Tuple
+
 import numpy as np
 
 from bluebird.tensor import Tensor
@@ -50,3 +52,24 @@ class MSE(Loss):
         """
 
         return  (predicted - actual) * 2
+
+    def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+        """
+        Calculates the loss and its gradient from one difference.
+
+        Args:
+            predicted (:obj:`Tensor`): models output
+            actual (:obj:`Tensor`): expected output
+
+        Returns:
+            Tuple[float, Tensor]: loss and gradient
+
+        """
+
+        diff = self.grad_buffer(np.broadcast(predicted, actual).shape, np.result_type(predicted, actual))
+        np.subtract(predicted, actual, out=diff)
+
+        loss = np.dot(diff.ravel(), diff.ravel())
+        diff *= 2
+
+        return loss, diff
@@ -0,0 +1,157 @@
+"""
+Softmax Cross Entropy
+=====================
+
+Softmax and categorical cross entropy in one loss, computed from logits (outputs of the last layer before softmax).
+
+Loss is computed with log-sum-exp, so it never takes a log of zero, and the gradient is exactly softmax - targets.
+Targets can also be given as class indices, like in :obj:`SparseCategoricalCrossEntropy`.
+
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from bluebird.tensor import Tensor
+
+from .loss import Loss
+
+class SoftmaxCrossEntropy(Loss):
+    """
+    Softmax followed by categorical cross entropy.
+
+    Last layer of the model has no activation, the model outputs logits.
+    To get probabilities from predictions, apply softmax to them (argmax is the same either way).
+
+    Softmax is computed into a buffer reused between steps.
+    During training (see loss_and_grad) the gradient is written over the softmax, in the same buffer.
+
+    Example::
+
+        net = NeuralNet([
+                ...
+                Linear(10)
+            ])
+        net.build(loss=SoftmaxCrossEntropy())
+
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the object.
+        """
+
+        self.softmax = None
+
+    def compute_softmax(self, logits: Tensor) -> None:
+        """
+        Calculates softmax of logits into a buffer reused between steps.
+
+        Log of the sum of exponentials for each row is kept as well.
+
+        Args:
+            logits (:obj:`Tensor`): models output
+        """
+
+        if self.softmax is None or self.softmax.shape != logits.shape or self.softmax.dtype != logits.dtype:
+            self.softmax = np.empty_like(logits)
+
+        maximum = logits.max(axis=1, keepdims=True)
+
+        np.subtract(logits, maximum, out=self.softmax)
+        np.exp(self.softmax, out=self.softmax)
+
+        sum_exp = self.softmax.sum(axis=1, keepdims=True)
+        self.softmax /= sum_exp
+
+        self.log_sum_exp = (np.log(sum_exp) + maximum)[:, 0]
+
+    def loss(self, predicted: Tensor, actual: Tensor) -> float:
+        """
+        Calculates the loss function.
+
+        loss = sum(targets * (log(sum(e^logits)) - logits))
+
+        Args:
+            predicted (:obj:`Tensor`): models output (logits)
+            actual (:obj:`Tensor`): expected output, or indices of right classes
+
+        Returns:
+            float: loss
+
+        """
+
+        self.compute_softmax(predicted)
+
+        if np.issubdtype(actual.dtype, np.integer):
+            labels = np.ravel(actual)
+            return float(np.sum(self.log_sum_exp) - np.sum(predicted[np.arange(len(labels)), labels]))
+
+        # targets of a row don't have to sum up to one (for example label smoothing)
+        return float(np.dot(actual.sum(axis=1), self.log_sum_exp) - np.einsum('ij,ij->', actual, predicted))
+
+    def grad(self, predicted: Tensor, actual: Tensor) -> Tensor:
+        """
+        Calculates the gradient of the loss with respect to logits.
+
+        grad = softmax(logits) * sum(targets) - targets
+
+        Args:
+            predicted (:obj:`Tensor`): models output (logits)
+            actual (:obj:`Tensor`): expected output, or indices of right classes
+
+        Returns:
+            :obj:`Tensor`: gradient
+
+        """
+
+        # logits can be a buffer overwritten in place (see Dense), so softmax is always computed again
+        self.compute_softmax(predicted)
+
+        return self.softmax_to_grad(np.array(self.softmax), actual)
+
+    def softmax_to_grad(self, grad: Tensor, actual: Tensor) -> Tensor:
+        """
+        Turns softmax into the gradient, in place.
+
+        Args:
+            grad (:obj:`Tensor`): softmax of logits
+            actual (:obj:`Tensor`): expected output, or indices of right classes
+
+        Returns:
+            :obj:`Tensor`: gradient
+
+        """
+
+        if np.issubdtype(actual.dtype, np.integer):
+            labels = np.ravel(actual)
+            grad[np.arange(len(labels)), labels] -= 1
+
+            return grad
+
+        grad *= actual.sum(axis=1, keepdims=True)
+        grad -= actual
+
+        return grad
+
+    def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+        """
+        Calculates the loss and its gradient.
+
+        Softmax buffer becomes the gradient, so a step uses only one buffer of the size of the output.
+
+        Args:
+            predicted (:obj:`Tensor`): models output (logits)
+            actual (:obj:`Tensor`): expected output, or indices of right classes
+
+        Returns:
+            Tuple[float, Tensor]: loss and gradient
+
+        """
+
+        loss = self.loss(predicted, actual)
+
+        grad = self.softmax_to_grad(self.softmax, actual)
+
+        return loss, grad
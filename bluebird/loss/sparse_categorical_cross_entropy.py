@@ -0,0 +1,93 @@
+"""
+Sparse Categorical Cross Entropy
+================================
+
+Categorical cross entropy for targets given as class indices instead of one-hot vectors.
+
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from bluebird.tensor import Tensor
+
+from .loss import Loss
+
+class SparseCategoricalCrossEntropy(Loss):
+    """
+    Categorical cross entropy with integer labels.
+
+    Gives the same loss and gradient as :obj:`CategoricalCrossEntropy` with one-hot targets,
+    but only the predicted probability of the right class is read for each sample, so one-hot matrices are never created.
+
+    Example::
+
+        (X_train, y_train), (X_test, y_test) = mnist.load_data()
+
+        loss = SparseCategoricalCrossEntropy()
+        net.build(loss=loss)
+        net.fit(DataLoader(X_train, y_train), num_epochs=5)
+    
+    """
+
+    def loss(self, predicted: Tensor, actual: Tensor) -> float:
+        """
+        Calculates the loss function.
+
+        Args:
+            predicted (:obj:`Tensor`): models output, probabilities of every class
+            actual (:obj:`Tensor`): indices of right classes
+
+        Returns:
+            float: loss
+
+        """
+
+        labels = np.ravel(actual)
+        picked = predicted[np.arange(len(labels)), labels]
+
+        # probability of exactly zero would give infinite loss
+        return - np.sum(np.log(np.maximum(picked, np.finfo(predicted.dtype).tiny)))
+
+    def grad(self, predicted: Tensor, actual: Tensor) -> Tensor:
+        """
+        Calculates the gradient of the loss function.
+
+        Args:
+            predicted (:obj:`Tensor`): models output, probabilities of every class
+            actual (:obj:`Tensor`): indices of right classes
+
+        Returns:
+            :obj:`Tensor`: gradient
+
+        """
+
+        labels = np.ravel(actual)
+
+        grad = np.array(predicted)
+        grad[np.arange(len(labels)), labels] -= 1
+
+        return grad
+
+    def loss_and_grad(self, predicted: Tensor, actual: Tensor) -> Tuple[float, Tensor]:
+        """
+        Calculates the loss and its gradient, gradient is written into a reused buffer.
+
+        Args:
+            predicted (:obj:`Tensor`): models output, probabilities of every class
+            actual (:obj:`Tensor`): indices of right classes
+
+        Returns:
+            Tuple[float, Tensor]: loss and gradient
+
+        """
+
+        loss = self.loss(predicted, actual)
+        labels = np.ravel(actual)
+
+        grad = self.grad_buffer(predicted.shape, predicted.dtype)
+        np.copyto(grad, predicted)
+        grad[np.arange(len(labels)), labels] -= 1
+
+        return loss, grad
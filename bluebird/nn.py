@@ -8,11 +8,12 @@ Default class for creating feed forward neural networs
 from bluebird.dataloader.dataloaderbase import DataLoaderBase
 from typing import Sequence, Iterator, Tuple
 
+import os
 import json
 import numpy as np
 
 from .tensor import Tensor
-from .layers import Layer, Input, MaxPool2D
+from .layers import Layer, Input, MaxPool2D, Linear, Conv2D, BatchNormalization
 from .loss import Loss, MSE
 from .optimizers import Optimizer, SGD
 from .activations import Activation
@@ -22,6 +23,8 @@ from .data import Batch
 
 from .exceptions import TypeException
 from .progress_tracker import ProgressBar
+from .parallel import DataParallel
+from .checkpoint import save_layers, load_layers, save_arrays, load_arrays, is_checkpoint
 
 import bluebird.utils as utl
 
@@ -53,18 +56,21 @@ class Model():
     """
 
 
-    def __init__(self, layers: Sequence[Layer]) -> None:
+    def __init__(self, layers: Sequence[Layer], dtype: np.dtype = np.float64) -> None:
         """
         Initalizes the object.
 
         Args:
             layers (Sequence[Layer]): sequence of layers of the newtwork
+            dtype (np.dtype, optional): type of params and data inside the network, 
+                np.float32 halves the memory and speeds up matrix multiplication, defaults to np.float64
 
         """
         if not isinstance(layers, Sequence):
             raise TypeException("layers", "Sequence[Layer]")
 
         self.layers = layers
+        self.dtype = np.dtype(dtype)
 
     def build(self,
             loss: Loss = MSE(),
@@ -92,6 +98,19 @@ class Model():
         self.loss = loss
         self.optimizer = optimizer
 
+        self.build_layers()
+        self.bind_buffers()
+
+        self.optimizer.build(self)
+
+    def build_layers(self) -> None:
+        """
+        Builds every layer, passing the output size of each layer to the next one.
+
+        Called by build, and by load for a model that isn't built.
+
+        """
+
         dimension = 0
         for layer in self.layers:
             if isinstance(layer, Activation):
@@ -108,7 +127,74 @@ class Model():
             layer.build(dimension)
             dimension = layer.output_size
 
-        self.optimizer.build(self)
+    def release_training_state(self) -> None:
+        """
+        Frees everything that only training needs: flat buffers, gradients, workspaces and the optimizer.
+
+        Params of layers are kept, the model can still predict, it has to be built again before training.
+
+        """
+
+        for layer in self.layers:
+            layer.grads.clear()
+
+            if isinstance(getattr(layer, 'workspace', None), dict):
+                layer.workspace.clear()
+
+        for name in ('flat_params', 'flat_grads', 'grad_views', 'param_slices', 'optimizer'):
+            if hasattr(self, name):
+                delattr(self, name)
+
+    def bind_buffers(self, params: Tensor = None, grads: Tensor = None) -> None:
+        """
+        Lays out params and grads of every layer as views of two contiguous flat buffers.
+
+        Optimizers then update the whole model with a few operations over flat_params and flat_grads,
+        and layers write their gradients directly into the buffer.
+        Params are converted to the model dtype while being copied.
+        Position of each param in the buffer is kept in param_slices, under the name "<layer index>.<param name>".
+
+        Args:
+            params (:obj:`Tensor`, optional): flat buffer for params, current one or a new one if not given
+            grads (:obj:`Tensor`, optional): flat buffer for grads, current one or a new one if not given
+
+        """
+
+        size = sum(param.size for layer in self.layers for param in layer.params.values())
+
+        if params is None:
+            params = getattr(self, 'flat_params', None)
+            if params is None or params.size != size or params.dtype != self.dtype:
+                params = np.empty(size, dtype=self.dtype)
+
+        if grads is None:
+            grads = getattr(self, 'flat_grads', None)
+            if grads is None or grads.size != size or grads.dtype != self.dtype:
+                grads = np.zeros(size, dtype=self.dtype)
+
+        self.grad_views = []
+        self.param_slices = {}
+        offset = 0
+
+        for index, layer in reversed(list(enumerate(self.layers))):
+            for name, param in layer.params.items():
+                view = params[offset:offset + param.size].reshape(param.shape)
+
+                # param that already is this part of the buffer is kept as it is
+                if not (isinstance(param, np.ndarray) and param.ctypes.data == view.ctypes.data
+                        and param.shape == view.shape and param.dtype == view.dtype):
+                    view[...] = param
+                    layer.params[name] = view
+
+                grad = grads[offset:offset + param.size].reshape(param.shape)
+                layer.grads[name] = grad
+                self.grad_views.append((layer, name, grad))
+                self.param_slices[f"{index}.{name}"] = slice(offset, offset + param.size)
+
+                offset += param.size
+
+        self.flat_params = params
+        self.flat_grads = grads
 
     def forward(self, inputs: Tensor) -> Tensor:
         """
@@ -122,6 +208,8 @@ class Model():
 
         """
 
+        inputs = np.asarray(inputs, dtype=self.dtype)
+
         for layer in self.layers:
             inputs = layer.forward(inputs, training=True)
         return inputs
@@ -131,6 +219,8 @@ class Model():
         """
         Backward propagates through the network.
 
+        Gradients are clipped between layers, unless the optimizer handles overflow by itself (see :obj:`MixedPrecision`).
+
         Args:
             inputs (:obj:`Tensor`): Gradient that you get from the loss function
 
@@ -139,9 +229,24 @@ class Model():
 
         """
 
+        clip = self.optimizer.clip_grads
+
         for layer in self.get_layers():
-            grad = utl.grad_clip(grad)
+            if clip:
+                grad = utl.grad_clip(grad)
             grad = layer.backward(grad)
+
+        # layers that create new gradients instead of writing into the buffer are copied back,
+        # params without a gradient get a zero gradient
+        for layer, name, view in self.grad_views:
+            grad_value = layer.grads.get(name)
+            if grad_value is not view:
+                if grad_value is None:
+                    view[...] = 0
+                else:
+                    view[...] = grad_value
+                layer.grads[name] = view
+
         return grad
 
     def get_layers(self) -> Iterator[Layer]:
@@ -156,22 +261,105 @@ class Model():
         for layer in reversed(self.layers):
             yield layer
 
-    def predict(self, inputs: Tensor) -> Tensor:
+    def predict(self, inputs: Tensor, batch_size: int = None, out: Tensor = None) -> Tensor:
         """
         Used to predict values after you finished the training.
 
+        With batch_size inputs are passed through the network in chunks, so only activations of one chunk
+        are kept in memory at a time. Inputs can be a memory mapped array, only the current chunk is then read.
+
+        Predicting keeps all activations local to the call, so one model can predict from many threads at once
+        (numpy releases the GIL during matrix multiplications). It must not be trained at the same time.
+
+        Example::
+
+            scores = np.lib.format.open_memmap('scores.npy', mode='w+', dtype=np.float32, shape=(len(x), 10))
+            net.predict(x, batch_size=1024, out=scores)
+
         Args:
             inputs (:obj:`Tensor`): values you wish to predict
+            batch_size (int, optional): number of inputs predicted at once, defaults to None (all at once)
+            out (:obj:`Tensor`, optional): array (can be memory mapped) that predictions are written into,
+                defaults to None (a new array is created)
 
         Returns: 
             :obj:`Tensor`: Predicted values
         
         """
 
+        if batch_size is None:
+            predicted = self.predict_batch(inputs)
+
+            if out is None:
+                return predicted
+
+            out[...] = predicted
+            return out
+
+        if not isinstance(batch_size, int):
+            raise TypeException("batch_size", "int")
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        n = len(inputs)
+
+        for start in range(0, n, batch_size):
+            predicted = self.predict_batch(inputs[start:start + batch_size])
+
+            if out is None:
+                out = np.empty((n,) + predicted.shape[1:], dtype=predicted.dtype)
+
+            out[start:start + len(predicted)] = predicted
+
+        if out is None:
+            out = self.predict_batch(inputs)
+
+        return out
+
+    def predict_batch(self, inputs: Tensor) -> Tensor:
+        """
+        Passes inputs through the network in inference mode, all at once.
+
+        Args:
+            inputs (:obj:`Tensor`): values you wish to predict
+
+        Returns: 
+            :obj:`Tensor`: Predicted values
+        
+        """
+
+        inputs = np.asarray(inputs, dtype=self.dtype)
+
         for layer in self.layers:
             inputs = layer.forward(inputs, training=False)
         return inputs
 
+    def predict_iter(self, loader: DataLoaderBase) -> Iterator[Tensor]:
+        """
+        Predicts batches of a data loader one by one.
+
+        Only one batch is in memory at a time, so the size of the data doesn't matter.
+        Predictions are in the same order as batches of the loader, so create it with shuffle=False.
+
+        Example::
+
+            loader = DataLoader(x, y, batch_size=1024, shuffle=False, num_workers=2)
+
+            for predicted in net.predict_iter(loader):
+                ...
+
+        Args:
+            loader (:obj:`DataLoaderBase`): loader of inputs, targets are ignored
+
+        Returns:
+            Iterator[:obj:`Tensor`]: predictions of every batch
+
+        """
+
+        for batch in loader():
+            yield self.predict_batch(batch.inputs)
+
     def get_params_and_grads(self) -> Iterator[Tensor]:
         """
         Returns parameters and gradients for each layer.
@@ -204,16 +392,34 @@ class Model():
 
         raise NotImplementedError
 
+    def compute_grads(self, batch: Batch) -> float:
+        """
+        Calculates the loss and gradients of every layer, without updating weights.
+
+        Needed for training on multiple workers, see :obj:`bluebird.parallel.DataParallel`.
+
+        Args:
+            batch (:obj:`Batch`): recives batch object, each batch object has inputs and targets
+
+        Raises:
+            NotImplementedError
+
+        """
+
+        raise NotImplementedError
+
 
     def fit(self, 
             loader: DataLoaderBase,
-            num_epochs: int) -> None:
+            num_epochs: int,
+            workers: int = 1) -> None:
         """
         Used to train the model.
 
         Args:
             loader (:obj:`DataLoaderBase`): data loader type object used to load data for training
             num_epochs (int): number of epochs you want to train
+            workers (int, optional): number of processes each batch is split between, defaults to 1
             
         """
         
@@ -221,19 +427,34 @@ class Model():
         if not isinstance(num_epochs, int):
             raise TypeException("num_epochs", "int")
 
+        if not isinstance(workers, int):
+            raise TypeException("workers", "int")
+
+        step = self.step
+        parallel = None
+
+        if workers > 1:
+            parallel = DataParallel(self, workers)
+            parallel.start()
+            step = parallel.step
+
         n = loader.__len__()
 
         epoch_loss = 0.0
         items = 0
-        for epoch in range(num_epochs):
-            bar = ProgressBar(n, num_epochs)
-
-            for batch in loader():
-                items += len(batch.inputs)
-                epoch_loss += self.step(batch)
-                bar.print_bar(items - n*epoch, epoch+1, epoch_loss/items)
-
-    def save(self, path: str = '.', filename: str = 'model') -> None:
+        try:
+            for epoch in range(num_epochs):
+                bar = ProgressBar(n, num_epochs)
+
+                for batch in loader():
+                    items += len(batch.inputs)
+                    epoch_loss += step(batch)
+                    bar.print_bar(items - n*epoch, epoch+1, epoch_loss/items)
+        finally:
+            if parallel is not None:
+                parallel.close()
+
+    def save(self, path: str = '.', filename: str = 'model', optimizer: bool = False) -> None:
         """
         Save the model to a file.
 
@@ -241,74 +462,121 @@ class Model():
 
         If you want your custom layer to be saved make sure, that everything you want to save is in params.
 
-        Everything is saved as a json object as follows:
-
-        .. code-block::
-
-            {
-                'layerName': [
-                    {
-                        name: 'paramName',
-                        value: '0.5888 2.59874.......'
-                    },
-                    ....
-                ]
-            }
+        Params are saved in a binary format (see :obj:`bluebird.checkpoint`),
+        a small json header describes each param, followed by raw data of every param.
 
         Args:
             path (:obj:`str`, optional): location where you want your model to be saved to,
                 defaults to '.' which means this directory
             name (:obj:`str`, optional): name of the file, defaults to 'model',
-                note: extension is added manually
+                note: extension (.bb) is added manually
+            optimizer (bool, optional): also save the state of the optimizer, next to the model in <filename>.optim.bb,
+                so the training can be resumed, defaults to False
 
         """
 
-        layers = {'layers': []}
+        if not path.endswith('/'):
+            path += '/'
 
-        for layer in self.layers:
-            name = type(layer).__name__
-            params = []
+        save_layers(path + filename + '.bb', self.layers)
 
-            for key, value in layer.params.items():
-                if isinstance(value, np.ndarray):
-                    value = value.tolist()
+        if optimizer:
+            save_arrays(path + filename + '.optim.bb', self.optimizer.state_dict())
 
-                p = {
-                    'name': key,
-                    'value': value
-                }
 
-                params.append(p)
+    def load(self, path: str, mmap: bool = False, optimizer: bool = False) -> None:
+        """
+        Load the model from a file.
 
-            l = {
-                name: params
-            }
+        Params are restored as Tensors, if the model is already built they are read directly into existing params.
+        Models saved as json by older versions can still be loaded.
 
-            layers['layers'].append(l)
+        Layers of a model that isn't built are built first (params are then replaced by the loaded ones).
 
-        if path.endswith('/'):
-            path += filename + '.json'
-        else:
-            path += '/' + filename + '.json'
+        With mmap params are mapped read-only from the file, they are loaded only when first used,
+        and processes that load the same model share the memory. Such a model can only be used for predicting,
+        flat buffers and the optimizer of a built model are released (see release_training_state).
 
-        with open(path, 'w') as f:
-            json.dump(layers, f)
+        Args:
+            path (:obj:`str`): path to the file where the model is saved
+            mmap (bool, optional): map params from the file instead of reading them, defaults to False
+            optimizer (bool, optional): also load the state of the optimizer saved next to the model,
+                model needs to be built, defaults to False
 
+        Raises:
+            ValueError: if mmap is used with a json model, or together with optimizer
 
-    def load(self, path: str) -> None:
         """
-        Load the model from a file.
 
-        Args:
-            path (:obj:`str`): path to the file where the model is saved
+        if mmap and optimizer:
+            raise ValueError("model loaded with mmap can only predict, its optimizer can't be loaded")
+
+        if is_checkpoint(path):
+            if not hasattr(self, 'flat_params'):
+                self.build_layers()
+
+            load_layers(path, self.layers, mmap)
+
+            if mmap:
+                # mapped model only predicts, training buffers would keep the memory mapping is meant to save
+                self.release_training_state()
+            elif hasattr(self, 'flat_params'):
+                self.bind_buffers()
+                self.optimizer.params_loaded()
+
+            if optimizer:
+                self.optimizer.load_state_dict(load_arrays(os.path.splitext(path)[0] + '.optim.bb'))
+            return
+
+        if mmap:
+            raise ValueError("mmap works only with models saved in binary format")
 
-        """
         with open(path) as f:
             data = json.load(f)
             for loaded, layer in zip(data['layers'], self.layers):
                 for key, value in loaded.items():
                     for param in value:
-                        layer.params[param['name']] = param['value']
+                        layer.params[param['name']] = np.array(param['value'])
+
+        if hasattr(self, 'flat_params'):
+            self.bind_buffers()
+            self.optimizer.params_loaded()
+
+    def fold_batch_norm(self) -> None:
+        """
+        Folds batch normalization layers into weights and biases of the Linear or Conv2D layer before them.
+
+        Folded layers are removed, so predicting skips them completely.
+        Use it before exporting the trained model, batch normalization no longer learns after it.
+
+        Example::
+
+            net.fit(loader, num_epochs=10)
+            net.fold_batch_norm()
+            net.save('.', 'exported')
+
+        """
+
+        layers = []
+
+        for layer in self.layers:
+            previous = layers[-1] if layers else None
+
+            if isinstance(layer, BatchNormalization) and isinstance(previous, (Linear, Conv2D)):
+                scale, shift = layer.scale_and_shift()
+
+                # scale multiplies the last axis (output features or channels) of both weights and biases
+                previous.params['w'] = previous.params['w'] * scale
+                previous.params['b'] = previous.params['b'] * scale + shift
+                continue
+
+            layers.append(layer)
+
+        self.layers = layers
+
+        if hasattr(self, 'flat_params'):
+            self.bind_buffers()
+            self.optimizer.build(self)
 
     def summary(self, shape: tuple) -> None:
         """
@@ -323,7 +591,7 @@ class Model():
 
         params_size = 0.0
 
-        inp = np.random.randn(*shape)
+        inp = np.random.randn(*shape).astype(self.dtype)
         idx = 1
         print()
         print('-'*60)
@@ -395,6 +663,30 @@ class NeuralNet(Model):
     """
 
 
+    def compute_grads(self, batch) -> float:
+        """
+        Calculates the loss and gradients of every layer, without updating weights.
+
+        Args:
+            batch (:obj:`Batch`): recives batch object, each batch object has inputs and targets
+
+        Returns:
+            float: returns calculated loss
+
+        """
+        predicted = self.forward(batch.inputs)
+        targets = np.asarray(batch.targets)
+
+        # class indices stay integers, see SparseCategoricalCrossEntropy
+        if not np.issubdtype(targets.dtype, np.integer):
+            targets = targets.astype(self.dtype, copy=False)
+
+        loss, grad = self.loss.loss_and_grad(predicted, targets)
+
+        self.backward(self.optimizer.scale_grad(grad))
+
+        return loss
+
     def step(self, batch) -> float:
         """
         Step function is called during each training step.
@@ -408,12 +700,7 @@ class NeuralNet(Model):
             float: returns calculated loss
 
         """
-        predicted = self.predict(batch.inputs)
-
-        loss = self.loss.loss(predicted, batch.targets) 
-        grad = self.loss.grad(predicted, batch.targets)
-
-        self.backward(grad)
+        loss = self.compute_grads(batch)
         self.optimizer.step()
 
         return loss
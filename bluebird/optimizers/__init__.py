@@ -15,4 +15,6 @@ from .optimizer import Optimizer
 from .nestov_momentum import NestovMomentum
 from .sgd import SGD
 from .adagrad import AdaGrad
-from .adam import Adam
\ No newline at end of file
+from .adam import Adam
+from .adamw import AdamW
+from .mixed_precision import MixedPrecision
\ No newline at end of file
@@ -42,7 +42,6 @@ class AdaGrad(Optimizer):
         """
         self.lr = lr
         self.epsilon = epsilon
-        self.an = None
 
     def build(self, net: 'NeuralNet') -> None:
         """
@@ -55,15 +54,8 @@ class AdaGrad(Optimizer):
 
         """
 
-        self.net = net
-
-        if self.an == None:
-            self.an = []
-            for layer in self.net.get_layers():
-                if isinstance(layer, Input) or isinstance(layer, Activation):
-                    continue
-                self.an.append(np.zeros(layer.params['w'].shape))
-                self.an.append(np.zeros(layer.params['b'].shape))
+        super().build(net)
+        self.update = np.zeros_like(net.flat_params)
 
     def step(self) -> None:
         """
@@ -72,7 +64,17 @@ class AdaGrad(Optimizer):
         This function is run during each of your training steps, it updates the model
         
         """
-              
-        for ((param, grad), a) in zip(self.net.get_params_and_grads(), self.an):
-            a += grad ** 2
-            param -= self.lr * grad / np.sqrt(a + self.epsilon)
\ No newline at end of file
+
+        grad = self.net.flat_grads
+        an = self.get_state('an')
+        update = self.update
+
+        np.multiply(grad, grad, out=update)
+        an += update
+
+        np.add(an, self.epsilon, out=update)
+        np.sqrt(update, out=update)
+        np.divide(grad, update, out=update)
+        update *= self.lr
+
+        self.net.flat_params -= update
\ No newline at end of file
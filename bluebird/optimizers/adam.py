@@ -6,7 +6,7 @@ Like Adaptive gradient, Adam (Adaptive Moment Estimator), also has adaptive lear
 
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict
 
 if TYPE_CHECKING:
     from .nn import NeuralNet
@@ -24,6 +24,9 @@ class Adam(Optimizer):
     """
     Adam optimizer.
 
+    Moments are updated in place and all the temporary results go to preallocated buffer,
+    so a step doesn't allocate any memory.
+
     Example::
 
         optim = Adam(lr=0.005)
@@ -35,7 +38,8 @@ class Adam(Optimizer):
                  b1: float = 0.9,
                  b2: float = 0.999,
                  t: int = 0,
-                 epsilon: float = 1e-8) -> None:
+                 epsilon: float = 1e-8,
+                 amsgrad: bool = False) -> None:
         """
         Initializes the object.
 
@@ -45,14 +49,14 @@ class Adam(Optimizer):
             b2 (float, optional): used to decay the running average of the squared gradient, defaults to 0.999
             t (int, otpional): time step, best to leave at zero, defaults to 0
             epsilon (float, optional): small value to scape the division by zero, best to leave it alone, defaults to 1e-8
+            amsgrad (bool, optional): use the maximum of all squared gradient averages (AMSGrad variant), defaults to False
         """
         self.lr = lr
         self.b1 = b1
         self.b2 = b2
-        self.mn = None
-        self.vn = None
         self.t = t
         self.epsilon = epsilon
+        self.amsgrad = amsgrad
 
     def build(self, net: 'NeuralNet') -> None:
         """
@@ -65,18 +69,15 @@ class Adam(Optimizer):
 
         """
 
-        self.net = net
+        super().build(net)
+        self.scratch = np.empty_like(net.flat_params)
+
+    def decay(self) -> None:
+        """
+        Called before the update, used by variants that apply weight decay.
+        """
 
-        if self.mn == None and self.vn == None:
-            self.mn = []
-            self.vn = []
-            for layer in self.net.get_layers():
-                if isinstance(layer, Input) or isinstance(layer, Activation):
-                    continue
-                self.mn.append(np.zeros(layer.params['w'].shape))
-                self.mn.append(np.zeros(layer.params['b'].shape))
-                self.vn.append(np.zeros(layer.params['w'].shape))
-                self.vn.append(np.zeros(layer.params['b'].shape))
+        pass
 
     def step(self) -> None:
         """
@@ -87,10 +88,67 @@ class Adam(Optimizer):
         """
 
         self.t += 1
-              
-        for ((param, grad), m, v) in zip(self.net.get_params_and_grads(), self.mn, self.vn):
-            m = self.b1 * m + (1 - self.b1) * grad
-            v = self.b2 * v + (1 - self.b2) * (grad ** 2)
-            mt = m / (1 - np.power(self.b1, self.t))
-            vt = v / (1 - np.power(self.b2, self.t))
-            param -= self.lr * mt / (np.sqrt(vt) + self.epsilon)
\ No newline at end of file
+
+        # bias corrections are the same for every param, so they are folded into two scalars
+        step_size = self.lr / (1 - self.b1 ** self.t)
+        correction = np.sqrt(1 - self.b2 ** self.t)
+
+        grad = self.net.flat_grads
+        m = self.get_state('m')
+        v = self.get_state('v')
+        s = self.scratch
+
+        self.decay()
+
+        # m = b1 * m + (1 - b1) * grad
+        m *= self.b1
+        np.multiply(grad, 1 - self.b1, out=s)
+        m += s
+
+        # v = b2 * v + (1 - b2) * grad^2
+        v *= self.b2
+        np.multiply(grad, grad, out=s)
+        s *= 1 - self.b2
+        v += s
+
+        if self.amsgrad:
+            vmax = self.get_state('vmax')
+            np.maximum(vmax, v, out=vmax)
+            v = vmax
+
+        # param -= lr * mt / (sqrt(vt) + epsilon)
+        np.sqrt(v, out=s)
+        s /= correction
+        s += self.epsilon
+        np.divide(m, s, out=s)
+        s *= step_size
+
+        self.net.flat_params -= s
+
+    def state_dict(self) -> Dict[str, Tensor]:
+        """
+        Returns the state of every param, and the time step.
+
+        Returns:
+            Dict[str, Tensor]: state of the optimizer
+
+        """
+
+        state = super().state_dict()
+        state['t'] = np.asarray(self.t)
+
+        return state
+
+    def load_state_dict(self, state: Dict[str, Tensor]) -> None:
+        """
+        Loads the state returned by state_dict.
+
+        Args:
+            state (Dict[str, Tensor]): state of the optimizer
+
+        """
+
+        super().load_state_dict(state)
+
+        if 't' in state:
+            self.t = int(state['t'])
@@ -0,0 +1,57 @@
+"""
+AdamW optimizer
+===============
+
+Adam with decoupled weight decay, weights are shrinked directly instead of adding decay to the gradient.
+
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .nn import NeuralNet
+
+import numpy as np
+
+from .adam import Adam
+
+
+class AdamW(Adam):
+    """
+    AdamW optimizer.
+
+    Example::
+
+        optim = AdamW(lr=0.001, weight_decay=0.01)
+        net.build(optimizer=optim)
+    """
+
+    def __init__(self,
+                 lr: float = 0.001,
+                 b1: float = 0.9,
+                 b2: float = 0.999,
+                 t: int = 0,
+                 epsilon: float = 1e-8,
+                 weight_decay: float = 0.01,
+                 amsgrad: bool = False) -> None:
+        """
+        Initializes the object.
+
+        Args:
+            lr (float, optional): learning rate, defaults to 0.001
+            b1 (float, optional): used to decay the running average of the gradient, defaults to 0.9
+            b2 (float, optional): used to decay the running average of the squared gradient, defaults to 0.999
+            t (int, otpional): time step, best to leave at zero, defaults to 0
+            epsilon (float, optional): small value to scape the division by zero, best to leave it alone, defaults to 1e-8
+            weight_decay (float, optional): how much weights shrink each step (scaled by learning rate), defaults to 0.01
+            amsgrad (bool, optional): use the maximum of all squared gradient averages (AMSGrad variant), defaults to False
+        """
+        super().__init__(lr, b1, b2, t, epsilon, amsgrad)
+        self.weight_decay = weight_decay
+
+    def decay(self) -> None:
+        """
+        Shrinks all the weights, before the Adam update.
+        """
+
+        self.net.flat_params *= 1 - self.lr * self.weight_decay
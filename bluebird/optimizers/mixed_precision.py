@@ -0,0 +1,173 @@
+"""
+Mixed precision
+===============
+
+Trains a model that stores its params, activations and gradients in float16,
+while updates are done on float32 copies of the params (master weights).
+
+Small gradients underflow in float16, so the loss is multiplied by a large scale before backward pass.
+Scale is lowered whenever gradients overflow (that step is skipped), and raised again after a number of good steps.
+Loss scaling replaces the clipping of gradients between layers.
+"""
+
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from .nn import NeuralNet
+
+import numpy as np
+
+from bluebird.tensor import Tensor
+from bluebird.layers import Layer
+
+from .optimizer import Optimizer
+
+
+class MixedPrecision(Optimizer):
+    """
+    Wraps another optimizer, which then updates the float32 master weights.
+
+    Example::
+
+        net = NeuralNet([...], dtype=np.float16)
+        net.build(optimizer=MixedPrecision(Adam(lr=0.001)))
+
+    """
+
+    clip_grads = False
+
+    def __init__(self,
+                 optimizer: Optimizer,
+                 scale: float = 2.0 ** 15,
+                 growth_interval: int = 2000,
+                 factor: float = 2.0,
+                 master_dtype: np.dtype = np.float32) -> None:
+        """
+        Initializes the object.
+
+        Args:
+            optimizer (:obj:`Optimizer`): optimizer used to update master weights
+            scale (float, optional): initial loss scale, defaults to 2^15
+            growth_interval (int, optional): number of steps without overflow after which the scale grows, defaults to 2000
+            factor (float, optional): scale is multiplied (grows) or divided (overflow) by it, defaults to 2
+            master_dtype (np.dtype, optional): type of master weights, defaults to np.float32
+        """
+        self.optimizer = optimizer
+        self.scale = scale
+        self.growth_interval = growth_interval
+        self.factor = factor
+        self.master_dtype = np.dtype(master_dtype)
+        self.good_steps = 0
+        self.skipped = 0
+
+    def build(self, net: 'NeuralNet') -> None:
+        """
+        Called before training, creates master weights and builds wrapped optimizer on them.
+
+        Args:
+            net (:obj:`NeuralNet`): your model
+
+        """
+
+        from bluebird.nn import Model
+
+        self.net = net
+
+        # every layer gets a master, so params have the same names in both models
+        layers = []
+        for layer in net.layers:
+            master = Layer()
+            for name, param in layer.params.items():
+                master.params[name] = param.astype(self.master_dtype)
+                master.grads[name] = np.zeros_like(master.params[name])
+            layers.append(master)
+
+        self.master = Model(layers, dtype=self.master_dtype)
+        self.master.bind_buffers()
+        self.optimizer.build(self.master)
+
+    def params_loaded(self) -> None:
+        """
+        Copies master weights from the model, so that loaded params aren't overwritten by the next step.
+        """
+
+        np.copyto(self.master.flat_params, self.net.flat_params)
+
+    def scale_grad(self, grad: Tensor) -> Tensor:
+        """
+        Multiplies the gradient of the loss by the loss scale.
+
+        Args:
+            grad (:obj:`Tensor`): gradient of the loss
+
+        Returns:
+            :obj:`Tensor`: scaled gradient
+
+        """
+
+        return grad * np.asarray(self.scale, dtype=grad.dtype)
+
+    def step(self) -> None:
+        """
+        Traning step.
+
+        Skips the update and lowers the scale if any gradient overflowed,
+        otherwise unscales gradients into master weights, updates them and copies them back to the model.
+        
+        """
+
+        grad = self.net.flat_grads
+        master_grad = self.master.flat_grads
+
+        # master and model buffers have the same layout, so the whole model is handled at once
+        np.multiply(grad, 1.0 / self.scale, out=master_grad, dtype=master_grad.dtype)
+
+        # nan and inf fail the comparison, and values near the largest finite one count as overflow as well
+        if not np.all(np.abs(master_grad) < np.finfo(grad.dtype).max / self.scale):
+            self.scale /= self.factor
+            self.good_steps = 0
+            self.skipped += 1
+            return
+
+        self.optimizer.step()
+
+        np.copyto(self.net.flat_params, self.master.flat_params, casting='same_kind')
+
+        self.good_steps += 1
+        if self.good_steps >= self.growth_interval:
+            self.scale *= self.factor
+            self.good_steps = 0
+
+    def state_dict(self) -> Dict[str, Tensor]:
+        """
+        Returns the state of wrapped optimizer, and the loss scale.
+
+        Returns:
+            Dict[str, Tensor]: state of the optimizer
+
+        """
+
+        state = self.optimizer.state_dict()
+        state['scale'] = np.asarray(self.scale)
+        state['good_steps'] = np.asarray(self.good_steps)
+
+        return state
+
+    def load_state_dict(self, state: Dict[str, Tensor]) -> None:
+        """
+        Loads the state returned by state_dict.
+
+        Master weights are copied from the model, in case its params were loaded as well.
+
+        Args:
+            state (Dict[str, Tensor]): state of the optimizer
+
+        """
+
+        self.params_loaded()
+        self.optimizer.load_state_dict(state)
+
+        if 'scale' in state:
+            self.scale = float(state['scale'])
+        if 'good_steps' in state:
+            self.good_steps = int(state['good_steps'])
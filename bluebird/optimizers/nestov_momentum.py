@@ -35,15 +35,17 @@ class NestovMomentum(Optimizer):
     """
 
     def __init__(self,
-                 lr: float = 0.001) -> None:
+                 lr: float = 0.001,
+                 momentum: float = 0.9) -> None:
         """
         Initializes the object.
 
         Args:
             lr (float, optional): learning rate, defaults to 0.001
+            momentum (float, optional): how much of the previous velocity is kept, defaults to 0.9
         """
         self.lr = lr
-        self.vs = None
+        self.momentum = momentum
 
     def build(self, net: 'NeuralNet') -> None:
         """
@@ -56,16 +58,8 @@ class NestovMomentum(Optimizer):
 
         """
 
-        self.net = net
-
-        if self.vs == None:
-            self.vs = []
-            for layer in self.net.get_layers():
-                if isinstance(layer, Input) or isinstance(layer, Activation):
-                    continue
-
-                self.vs.append(np.zeros(layer.params['w'].shape))
-                self.vs.append(np.zeros(layer.params['b'].shape))
+        super().build(net)
+        self.update = np.zeros_like(net.flat_params)
 
     def step(self) -> None:
         """
@@ -74,8 +68,18 @@ class NestovMomentum(Optimizer):
         This function is run during each of your training steps, it updates the model
         
         """
-        
-        for ((param, grad), v) in zip(self.net.get_params_and_grads(), self.vs):
-            v = param * v - self.lr * grad
-            param += v
+
+        v = self.get_state('v')
+        update = self.update
+        params = self.net.flat_params
+
+        # param += -momentum * v_prev + (1 + momentum) * v, which is momentum * v - lr * grad
+        np.multiply(self.net.flat_grads, -self.lr, out=update)
+
+        v *= self.momentum
+        v += update
+        params += update
+
+        np.multiply(v, self.momentum, out=update)
+        params += update
 
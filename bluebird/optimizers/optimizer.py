@@ -4,9 +4,13 @@ Optimizer
 
 Base optimizer class that all other optimizers inherit.
 
+State of optimizers (moments, velocities...) is kept in a registry of flat buffers,
+with the same layout as flat params of the model. Each buffer is created on first use,
+so only the state that an optimizer actually needs is allocated.
+
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict
 
 if TYPE_CHECKING:
     from .nn import NeuralNet
@@ -25,16 +29,35 @@ class Optimizer:
 
         class CustomOptimizer(Optimizer):
             def build(self, net: 'NeuralNet') -> None:
-                self.net = net
+                super().build(net)
                 
                 ... Any aditional variables you wish to initialize
 
             def step(self) -> None:
-                for param, grad in self.net.get_params_and_grads():
-                    ... Update params and grads
+                velocity = self.get_state('velocity')
+                ... Update self.net.flat_params using self.net.flat_grads,
+                ... params and grads of all the layers are views of these two buffers
 
     """
 
+    clip_grads = True
+
+    def scale_grad(self, grad: Tensor) -> Tensor:
+        """
+        Called on the gradient of the loss, before backward pass.
+
+        Returns the gradient unchanged, optimizers that use loss scaling override it.
+
+        Args:
+            grad (:obj:`Tensor`): gradient of the loss
+
+        Returns:
+            :obj:`Tensor`: gradient passed to backward pass
+
+        """
+
+        return grad
+
     def step(self) -> None:
         """
         At each step the neural net is updated.
@@ -48,12 +71,93 @@ class Optimizer:
 
     def build(self, net: 'NeuralNet') -> None:
         """
-        Set aditional parameters needed for step.
+        Called before training, optimizer needs the model to be able to iterate over params.
 
-        Raises:
-            NotImplementedError
+        State that was already created is kept if the model still has the same size,
+        so a model can be rebuilt (or its params loaded) without losing it.
+
+        Args:
+            net (:obj:`NeuralNet`): your model
 
         """
-        raise NotImplementedError
+
+        self.net = net
+
+        state = getattr(self, 'state', {})
+        self.state = {
+            name: value for name, value in state.items()
+            if value.shape == net.flat_params.shape and value.dtype == net.flat_params.dtype
+        }
+
+    def params_loaded(self) -> None:
+        """
+        Called after params of the model were loaded (see :obj:`Model.load`).
+
+        Does nothing by default, optimizers that keep their own copy of params (:obj:`MixedPrecision`) refresh it.
+
+        """
+
+        pass
+
+    def get_state(self, name: str) -> Tensor:
+        """
+        Returns a flat state buffer, creates it filled with zeros on first use.
+
+        Args:
+            name (str): name of the state
+
+        Returns:
+            :obj:`Tensor`: state with the same layout as flat params of the model
+
+        """
+
+        value = self.state.get(name)
+
+        if value is None:
+            value = np.zeros_like(self.net.flat_params)
+            self.state[name] = value
+
+        return value
+
+    def state_dict(self) -> Dict[str, Tensor]:
+        """
+        Returns the state of every param, as views of state buffers.
+
+        Keys are "<param name>/<state name>", where param name is the one in param_slices of the model.
+
+        Returns:
+            Dict[str, Tensor]: state of the optimizer
+
+        """
+
+        state = {}
+
+        for key, index in self.net.param_slices.items():
+            for name, value in self.state.items():
+                state[f"{key}/{name}"] = value[index]
+
+        return state
+
+    def load_state_dict(self, state: Dict[str, Tensor]) -> None:
+        """
+        Loads the state returned by state_dict.
+
+        State of params that the model doesn't have is ignored, and params missing from the state start from zeros.
+
+        Args:
+            state (Dict[str, Tensor]): state of the optimizer
+
+        """
+
+        for key, value in state.items():
+            param, _, name = key.rpartition('/')
+            index = self.net.param_slices.get(param)
+
+            if index is None:
+                continue
+
+            buffer = self.get_state(name)[index]
+            if buffer.size == np.size(value):
+                buffer[...] = np.ravel(value)
 
 # TO DO: RMSprop, Adadelta, Adamax, Nadam, Ftrl
\ No newline at end of file
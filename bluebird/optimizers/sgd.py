@@ -50,7 +50,8 @@ class SGD(Optimizer):
 
         """
 
-        self.net = net
+        super().build(net)
+        self.update = np.zeros_like(net.flat_params)
 
     def step(self) -> None:
         """
@@ -60,5 +61,5 @@ class SGD(Optimizer):
         
         """
         
-        for param, grad in self.net.get_params_and_grads():
-            param -= self.lr * grad
+        np.multiply(self.net.flat_grads, self.lr, out=self.update)
+        self.net.flat_params -= self.update
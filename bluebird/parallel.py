@@ -0,0 +1,285 @@
+"""
+Data parallel training
+======================
+
+Splits every batch between several processes, each process computes the gradients on its part of the batch.
+
+Flat parameter buffer of the model is moved to shared memory, so every worker sees the weights updated by the optimizer without copying them.
+Each worker writes gradients into its row of a shared matrix, and the rows are summed (all-reduce) before the optimizer step,
+because losses are summed over the batch this gives the same gradient as a single process would.
+
+Note: layers that depend on whole batch statistics (BatchNormalization) see only their part of the batch.
+Their running statistics (buffers) are kept in shared memory as well, one row per worker,
+and are averaged over the workers after every step.
+
+Example::
+
+    net.fit(loader, num_epochs=10, workers=4)
+"""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .nn import Model
+
+import ctypes
+import multiprocessing as mp
+
+import numpy as np
+
+from .tensor import Tensor
+from .data import Batch
+
+
+def shared_buffer(size: int, dtype: np.dtype) -> mp.RawArray:
+    """
+    Allocates shared memory big enough for size elements of dtype.
+
+    Args:
+        size (int): number of elements
+        dtype (np.dtype): type of elements
+
+    Returns:
+        RawArray: shared memory block
+    """
+
+    return mp.RawArray(ctypes.c_byte, max(1, size) * np.dtype(dtype).itemsize)
+
+
+def bind_layer_buffers(model: 'Model', flat: Tensor) -> None:
+    """
+    Makes buffers of every layer views of a flat array, in the order of layers.
+
+    Args:
+        model (:obj:`Model`): model whose buffers are bound
+        flat (:obj:`Tensor`): flat array of the model dtype, big enough for all the buffers
+
+    """
+
+    offset = 0
+
+    for layer in model.layers:
+        for name, value in layer.buffers.items():
+            view = flat[offset:offset + value.size].reshape(value.shape)
+            view[...] = value
+            layer.buffers[name] = view
+
+            offset += value.size
+
+
+def buffers_size(model: 'Model') -> int:
+    """
+    Number of elements in buffers of all layers.
+
+    Args:
+        model (:obj:`Model`): the model
+
+    Returns:
+        int: total size of buffers
+    """
+
+    return sum(value.size for layer in model.layers for value in layer.buffers.values())
+
+
+def reseed(model: 'Model', seed: np.random.SeedSequence) -> None:
+    """
+    Reseeds the global random generator and generators of layers (like :obj:`Dropout`).
+
+    Forked workers inherit the random state of the main process,
+    without reseeding every worker would drop the same inputs from its part of the batch.
+
+    Args:
+        model (:obj:`Model`): model whose layers are reseeded
+        seed (np.random.SeedSequence): seed of this worker
+
+    """
+
+    layers = [layer for layer in model.layers if isinstance(getattr(layer, 'random', None), np.random.Generator)]
+    seeds = seed.spawn(len(layers) + 1)
+
+    np.random.seed(seeds[0].generate_state(1))
+
+    for layer, layer_seed in zip(layers, seeds[1:]):
+        layer.random = np.random.default_rng(layer_seed)
+
+
+def run_worker(model: 'Model', params: mp.RawArray, grads: mp.RawArray, buffers: mp.RawArray,
+               seed: np.random.SeedSequence, index: int, conn) -> None:
+    """
+    Worker loop, receives parts of batches and writes gradients to shared memory.
+
+    Each message is a batch and the current loss scale of the optimizer (see :obj:`MixedPrecision`),
+    worker stops when it receives None.
+
+    Args:
+        model (:obj:`Model`): replica of the model
+        params (RawArray): shared parameters
+        grads (RawArray): shared gradients of all the workers
+        buffers (RawArray): shared buffers (running statistics) of all the workers
+        seed (np.random.SeedSequence): seed of this worker
+        index (int): index of this worker, selects its row of gradients
+        conn (Connection): pipe to the main process
+    """
+
+    reseed(model, seed)
+
+    size = model.flat_params.size
+    flat_params = np.frombuffer(params, dtype=model.dtype)[:size]
+    flat_grads = np.frombuffer(grads, dtype=model.dtype)[index * size:(index + 1) * size]
+
+    # layers write their gradients straight into this worker's row of shared memory
+    model.bind_buffers(flat_params, flat_grads)
+
+    buffer_size = buffers_size(model)
+    bind_layer_buffers(model, np.frombuffer(buffers, dtype=model.dtype)[index * buffer_size:(index + 1) * buffer_size])
+
+    while True:
+        message = conn.recv()
+
+        if message is None:
+            break
+
+        batch, scale = message
+
+        # loss scale changes in the main process, gradients have to be scaled by the current one
+        if scale is not None:
+            model.optimizer.scale = scale
+
+        if len(batch.inputs) == 0:
+            flat_grads[...] = 0
+            conn.send(0.0)
+            continue
+
+        conn.send(model.compute_grads(batch))
+
+    conn.close()
+
+
+class DataParallel():
+    """
+    Trains the model on several processes.
+
+    Example::
+
+        parallel = DataParallel(net, workers=4)
+        parallel.start()
+
+        for batch in loader():
+            loss = parallel.step(batch)
+
+        parallel.close()
+    """
+
+    def __init__(self, model: 'Model', workers: int) -> None:
+        """
+        Initalizes the object.
+
+        Args:
+            model (:obj:`Model`): built model
+            workers (int): number of processes
+
+        """
+
+        self.model = model
+        self.workers = workers
+        self.processes = []
+        self.conns = []
+
+    def start(self) -> None:
+        """
+        Moves parameters to shared memory and starts the workers.
+        """
+
+        size = self.model.flat_params.size
+        dtype = self.model.dtype
+
+        self.params = shared_buffer(size, dtype)
+        self.grads = shared_buffer(self.workers * size, dtype)
+
+        buffer_size = buffers_size(self.model)
+        self.buffers = shared_buffer(self.workers * buffer_size, dtype)
+
+        self.model.bind_buffers(np.frombuffer(self.params, dtype=dtype)[:size], self.model.flat_grads)
+
+        # gradients of all the workers as one matrix, so all-reduce is a single sum
+        self.worker_grads = np.frombuffer(self.grads, dtype=dtype)[:self.workers * size].reshape(self.workers, size)
+
+        # buffers of the model are bound to a flat array too, so averaged statistics are copied with one operation
+        self.model_buffers = np.empty(buffer_size, dtype=dtype)
+        bind_layer_buffers(self.model, self.model_buffers)
+
+        self.worker_buffers = np.frombuffer(self.buffers, dtype=dtype)[:self.workers * buffer_size].reshape(self.workers, buffer_size)
+        self.worker_buffers[...] = self.model_buffers
+
+        # entropy comes from the global generator, so seeding numpy makes the workers reproducible
+        seeds = np.random.SeedSequence(np.random.randint(2 ** 31)).spawn(self.workers)
+
+        for index in range(self.workers):
+            parent, child = mp.Pipe()
+            process = mp.Process(target=run_worker,
+                                 args=(self.model, self.params, self.grads, self.buffers, seeds[index], index, child),
+                                 daemon=True)
+            process.start()
+            child.close()
+
+            self.processes.append(process)
+            self.conns.append(parent)
+
+    def step(self, batch: Batch) -> float:
+        """
+        Training step on the whole batch.
+
+        Args:
+            batch (:obj:`Batch`): batch of data
+
+        Returns:
+            float: loss of the whole batch
+        """
+
+        shards = np.array_split(np.arange(len(batch.inputs)), self.workers)
+        scale = getattr(self.model.optimizer, 'scale', None)
+
+        for conn, shard in zip(self.conns, shards):
+            conn.send((Batch(batch.inputs[shard], batch.targets[shard]), scale))
+
+        loss = sum(conn.recv() for conn in self.conns)
+
+        np.sum(self.worker_grads, axis=0, out=self.model.flat_grads)
+
+        # only workers that got a part of the batch updated their statistics, every worker continues from the average
+        active = min(self.workers, len(batch.inputs))
+        np.mean(self.worker_buffers[:active], axis=0, out=self.model_buffers)
+        self.worker_buffers[...] = self.model_buffers
+
+        self.model.optimizer.step()
+
+        return loss
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Stops the workers.
+
+        Runs during cleanup after errors as well, so workers that already died are skipped,
+        and workers that don't stop in time are terminated.
+
+        Args:
+            timeout (float, optional): seconds each worker has to stop, defaults to 5
+
+        """
+
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+
+        for process in self.processes:
+            process.join(timeout)
+
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        self.processes = []
+        self.conns = []
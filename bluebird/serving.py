@@ -0,0 +1,474 @@
+"""
+Serving
+=======
+
+Serves predictions of a trained model over HTTP (TCP or a Unix socket).
+
+Requests that arrive at the same time are collected into micro-batches and predicted with a single call,
+one matrix multiplication over the whole batch is far cheaper than one per request.
+Batch is predicted as soon as it's full, or when its first request waited for max_wait seconds,
+so latency under low load stays bounded.
+Waiting requests are limited (max_queue), under overload the server answers ``503 Service Unavailable``
+right away instead of letting requests pile up in memory.
+
+Protocol is a single endpoint, ``POST /predict`` with a json body ``{"inputs": sample}``,
+it responds with ``{"outputs": prediction}``. Connections are kept alive between requests.
+
+Example::
+
+    net.load('model.bb')
+    server = InferenceServer(net, port=8000, max_batch_size=64, max_wait=0.002)
+    server.serve_forever()
+
+Benchmark it from another process::
+
+    stats = asyncio.run(benchmark(samples, port=8000, concurrency=64))
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .nn import Model
+
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from .tensor import Tensor
+
+
+class MicroBatcher():
+    """
+    Collects single samples into batches and predicts them with one call.
+
+    Predictions run in a thread pool, so requests for the next batch are collected while the current one is predicted.
+
+    Example::
+
+        batcher = MicroBatcher(net, max_batch_size=64, max_wait=0.002)
+        batcher.start()
+
+        prediction = await batcher.predict(sample)
+    """
+
+    def __init__(self, model: 'Model', max_batch_size: int = 32, max_wait: float = 0.005, max_queue: int = None) -> None:
+        """
+        Initializes the object.
+
+        Args:
+            model (:obj:`Model`): built model
+            max_batch_size (int, optional): maximum number of samples predicted at once, defaults to 32
+            max_wait (float, optional): maximum time in seconds a sample waits for others to join its batch, defaults to 0.005
+            max_queue (int, optional): maximum number of samples waiting for a batch, defaults to 8 * max_batch_size
+
+        """
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = 8 * max_batch_size if max_queue is None else max_queue
+
+        self.requests = 0
+        self.batches = 0
+        self.task = None
+
+    def start(self) -> None:
+        """
+        Starts collecting batches, must be called from a running event loop.
+        """
+
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.task = asyncio.ensure_future(self.run())
+
+    async def close(self) -> None:
+        """
+        Stops collecting batches.
+        """
+
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def predict(self, sample: Tensor) -> Tensor:
+        """
+        Predicts a single sample, as part of a batch.
+
+        Args:
+            sample (:obj:`Tensor`): one input, without the batch dimension
+
+        Returns:
+            :obj:`Tensor`: prediction for the sample
+
+        Raises:
+            asyncio.QueueFull: max_queue samples are already waiting
+
+        """
+
+        future = asyncio.get_event_loop().create_future()
+        self.queue.put_nowait((np.asarray(sample), future))
+
+        return await future
+
+    async def collect(self) -> List[Tuple[Tensor, asyncio.Future]]:
+        """
+        Waits for the first sample, then collects others until the batch is full or max_wait passes.
+
+        Returns:
+            List[Tuple[Tensor, asyncio.Future]]: samples and their futures
+        """
+
+        loop = asyncio.get_event_loop()
+
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def run(self) -> None:
+        """
+        Predicts collected batches until it's cancelled.
+        """
+
+        loop = asyncio.get_event_loop()
+
+        while True:
+            batch = await self.collect()
+
+            # samples of different shapes can't be stacked, each shape is predicted separately
+            groups: Dict[tuple, list] = {}
+            for sample, future in batch:
+                groups.setdefault(sample.shape, []).append((sample, future))
+
+            for group in groups.values():
+                self.requests += len(group)
+                self.batches += 1
+
+                try:
+                    outputs = await loop.run_in_executor(None, self.model.predict, np.stack([s for s, _ in group]))
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_, future), output in zip(group, outputs):
+                    if not future.done():
+                        future.set_result(output)
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str], bytes]:
+    """
+    Reads one HTTP request or response.
+
+    Args:
+        reader (asyncio.StreamReader): stream of the connection
+
+    Returns:
+        Tuple[str, Dict[str, str], bytes]: start line, headers (lowercase names) and body,
+            or None if the connection was closed
+
+    Raises:
+        ValueError: Content-Length is not a non-negative integer
+    """
+
+    line = await reader.readline()
+
+    if not line:
+        return None
+
+    headers = {}
+    while True:
+        header = await reader.readline()
+
+        if header in (b'\r\n', b'\n', b''):
+            break
+
+        name, _, value = header.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    length = headers.get('content-length', '0')
+
+    if not length.isdigit():
+        raise ValueError(f"invalid Content-Length: {length!r}")
+
+    body = await reader.readexactly(int(length))
+
+    return line.decode('latin-1').strip(), headers, body
+
+
+def write_message(writer: asyncio.StreamWriter, start: str, payload: dict) -> None:
+    """
+    Writes one HTTP request or response with a json body.
+
+    Args:
+        writer (asyncio.StreamWriter): stream of the connection
+        start (str): start line, request line or status line
+        payload (dict): json serializable body
+    """
+
+    body = json.dumps(payload).encode('utf-8')
+    head = f"{start}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+
+    writer.write(head.encode('latin-1') + body)
+
+
+class InferenceServer():
+    """
+    HTTP server that predicts with micro-batches.
+
+    Example::
+
+        server = InferenceServer(net, port=8000)
+        server.serve_forever()
+
+    """
+
+    def __init__(self,
+                 model: 'Model',
+                 host: str = '127.0.0.1',
+                 port: int = 8000,
+                 path: str = None,
+                 max_batch_size: int = 32,
+                 max_wait: float = 0.005,
+                 max_queue: int = None) -> None:
+        """
+        Initializes the object.
+
+        Args:
+            model (:obj:`Model`): built model
+            host (str, optional): address to listen on, defaults to '127.0.0.1'
+            port (int, optional): port to listen on, 0 picks a free one, defaults to 8000
+            path (str, optional): listen on this Unix socket instead of TCP, defaults to None
+            max_batch_size (int, optional): maximum number of samples predicted at once, defaults to 32
+            max_wait (float, optional): maximum time in seconds a sample waits for others to join its batch, defaults to 0.005
+            max_queue (int, optional): maximum number of requests waiting for a batch, defaults to 8 * max_batch_size
+
+        """
+
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait, max_queue)
+        self.server = None
+
+    async def start(self) -> None:
+        """
+        Starts listening, must be called from a running event loop.
+
+        When started on port 0, the port that was picked is set to port.
+        """
+
+        self.batcher.start()
+
+        if self.path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+        else:
+            self.server = await asyncio.start_server(self.handle, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """
+        Stops listening and predicting.
+        """
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+        await self.batcher.close()
+
+    def serve_forever(self) -> None:
+        """
+        Runs the server until it's interrupted.
+        """
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(self.start())
+
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            loop.run_until_complete(self.close())
+            loop.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers requests of one connection, until the client closes it.
+
+        Args:
+            reader (asyncio.StreamReader): incoming stream
+            writer (asyncio.StreamWriter): outgoing stream
+
+        """
+
+        try:
+            while True:
+                message = await read_message(reader)
+
+                if message is None:
+                    break
+
+                request, headers, body = message
+                status, payload = await self.respond(request, body)
+
+                write_message(writer, f"HTTP/1.1 {status}", payload)
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except ValueError as e:
+            # end of the body is unknown, so the connection can't be used for other requests
+            try:
+                write_message(writer, "HTTP/1.1 400 Bad Request", {'error': str(e)})
+                await writer.drain()
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request: str, body: bytes) -> Tuple[str, dict]:
+        """
+        Creates the response to one request.
+
+        Args:
+            request (str): request line
+            body (bytes): body of the request
+
+        Returns:
+            Tuple[str, dict]: status and json body
+        """
+
+        method, target = (request.split(' ') + ['', ''])[:2]
+
+        if method != 'POST' or target != '/predict':
+            return '404 Not Found', {'error': 'only POST /predict is supported'}
+
+        try:
+            sample = np.asarray(json.loads(body.decode('utf-8'))['inputs'], dtype=np.float64)
+        except (ValueError, KeyError, TypeError) as e:
+            return '400 Bad Request', {'error': str(e)}
+
+        try:
+            output = await self.batcher.predict(sample)
+        except asyncio.QueueFull:
+            return '503 Service Unavailable', {'error': 'too many requests are waiting'}
+        except Exception as e:
+            return '500 Internal Server Error', {'error': str(e)}
+
+        return '200 OK', {'outputs': output.tolist()}
+
+
+async def benchmark(samples: Sequence[Tensor],
+                    host: str = '127.0.0.1',
+                    port: int = 8000,
+                    path: str = None,
+                    requests: int = 1000,
+                    concurrency: int = 32) -> Dict[str, float]:
+    """
+    Sends requests from many concurrent clients and measures throughput and latency.
+
+    Each client keeps its connection open and sends its next request as soon as it gets a response.
+
+    Example::
+
+        stats = asyncio.run(benchmark(x_test[:100], port=8000))
+        print(stats['throughput'], stats['p99'])
+
+    Args:
+        samples (Sequence[Tensor]): inputs that are sent, in turns
+        host (str, optional): address of the server, defaults to '127.0.0.1'
+        port (int, optional): port of the server, defaults to 8000
+        path (str, optional): Unix socket of the server, used instead of TCP, defaults to None
+        requests (int, optional): total number of requests, defaults to 1000
+        concurrency (int, optional): number of clients, defaults to 32
+
+    Returns:
+        Dict[str, float]: requests that got a response, errors, throughput (requests per second),
+            and p50, p99 and max latency (seconds), a client stops after its connection is closed
+    """
+
+    bodies = [json.dumps({'inputs': np.asarray(s).tolist()}) for s in samples]
+    latencies = []
+    errors = 0
+
+    async def client(count: int, offset: int) -> None:
+        nonlocal errors
+
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        try:
+            for i in range(count):
+                body = bodies[(offset + i) % len(bodies)].encode('utf-8')
+                head = f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+
+                start = time.perf_counter()
+
+                try:
+                    writer.write(head.encode('latin-1') + body)
+                    await writer.drain()
+                    message = await read_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    message = None
+
+                # server closed the connection, this client can't send any more requests
+                if message is None:
+                    errors += 1
+                    break
+
+                status, _, _ = message
+                latencies.append(time.perf_counter() - start)
+
+                if ' 200 ' not in status + ' ':
+                    errors += 1
+        finally:
+            writer.close()
+
+    counts = [len(part) for part in np.array_split(np.arange(requests), concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(count, i) for i, count in enumerate(counts) if count > 0))
+    elapsed = time.perf_counter() - start
+
+    # clients stop when their connection is closed, so fewer requests than asked for can complete
+    completed = len(latencies)
+
+    if not latencies:
+        latencies = [float('nan')]
+
+    return {
+        'requests': completed,
+        'errors': errors,
+        'throughput': completed / elapsed,
+        'p50': float(np.percentile(latencies, 50)),
+        'p99': float(np.percentile(latencies, 99)),
+        'max': float(np.max(latencies))
+    }
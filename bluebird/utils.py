@@ -10,7 +10,7 @@ import numpy as np
 from .tensor import Tensor
 
 
-def fix_overflow(x:Tensor) -> Tensor:
+def fix_overflow(x:Tensor, copy: bool = True) -> Tensor:
     """
     Ensures to fix infinite and not a number values.
 
@@ -20,13 +20,14 @@ def fix_overflow(x:Tensor) -> Tensor:
     
     Args:
         x (:obj:`Tensor`): Tensor with nan and inf values
+        copy (bool, optional): if false x is fixed in place, defaults to True
 
     Returns:
         :obj:`Tensor`: Tensor without inf and nan values
 
     """
 
-    return np.nan_to_num(x)
+    return np.nan_to_num(x, copy=copy)
 
 def clip(x:Tensor) -> Tensor:
     """
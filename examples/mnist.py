@@ -11,23 +11,13 @@ import bluebird
 from bluebird.nn import NeuralNet
 from bluebird.activations import Relu, Sigmoid, Softmax, Tanh
 from bluebird.layers import Flatten, Dropout, Dense, Linear, BatchNormalization
-from bluebird.loss import CategoricalCrossEntropy
+from bluebird.loss import SparseCategoricalCrossEntropy
 from bluebird.metrics import accuracy
 
 from bluebird.dataloader import DataLoader
 
 (X_train, y_train), (X_test, y_test) = load_data()
 
-def convert_labels(labels: np.ndarray) -> np.ndarray:
-    ar = np.zeros((labels.shape[0], 10))
-
-    for (i, j) in zip(range(ar.shape[0]), labels):
-        ar[i][j] = 1
-
-    return ar
-
-y_train = convert_labels(y_train)
-y_test = convert_labels(y_test)
 X_train = X_train / 255.0
 X_test = X_test / 255.0
 
@@ -43,7 +33,7 @@ net = NeuralNet([
 
 dl = DataLoader(X_train, y_train)
 
-net.build(optimizer=bluebird.optimizers.Adam(lr=0.0001), loss=CategoricalCrossEntropy())
+net.build(optimizer=bluebird.optimizers.Adam(lr=0.0001), loss=SparseCategoricalCrossEntropy())
 
 net.fit(dl, num_epochs=5)
 
@@ -53,11 +43,10 @@ for (im, tst) in zip(X_test[:10], y_test[:10]):
     im = np.array([im])
     pred = net.predict(np.array(im))
 
-    print("{b: > 4}, {c: > 4}".format(b=np.argmax(pred), c=np.argmax(tst)))
+    print("{b: > 4}, {c: > 4}".format(b=np.argmax(pred), c=tst))
 
 p = net.predict(X_test)
 
 p = p.argmax(axis=1)
-y_test = y_test.argmax(axis=1)
 
 print(accuracy(p, y_test))
\ No newline at end of file
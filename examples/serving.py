@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath('../'))
+
+import asyncio
+
+import numpy as np
+
+from bluebird.nn import NeuralNet
+from bluebird.activations import Relu, Softmax
+from bluebird.layers import Flatten, Dense
+from bluebird.serving import InferenceServer, benchmark
+
+# untrained model of mnist size, only the speed matters here
+net = NeuralNet([
+    Flatten(input_size=(28, 28)),
+    Dense(300, activation=Relu()),
+    Dense(100, activation=Relu()),
+    Dense(10, activation=Softmax())
+], dtype=np.float32)
+net.build()
+
+samples = np.random.rand(100, 28, 28)
+
+async def run(max_batch_size: int) -> dict:
+    server = InferenceServer(net, port=0, max_batch_size=max_batch_size, max_wait=0.002)
+    await server.start()
+
+    stats = await benchmark(samples, port=server.port, requests=2000, concurrency=64)
+
+    await server.close()
+    return stats
+
+loop = asyncio.new_event_loop()
+
+print("{:>10} {:>12} {:>10} {:>10}".format("batch", "requests/s", "p50 ms", "p99 ms"))
+
+for max_batch_size in [1, 8, 64]:
+    stats = loop.run_until_complete(run(max_batch_size))
+    print("{:>10} {:>12.0f} {:>10.2f} {:>10.2f}".format(max_batch_size, stats['throughput'],
+                                                        stats['p50'] * 1000, stats['p99'] * 1000))
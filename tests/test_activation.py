@@ -79,4 +79,60 @@ class TestLeakyRely(unittest.TestCase):
 
         diff = grad_calc_activ(x, leaky, 1e-8, 0.02)
 
-        assert diff < 1e-8, "Gradient not calculated properly"
\ No newline at end of file
+        assert diff < 1e-8, "Gradient not calculated properly"
+
+class TestEngine(unittest.TestCase):
+
+    def test_backward(self):
+        """Tests that in place backward matches f_prime and doesn't change its inputs"""
+
+        for layer, argv in [(Relu(), ()), (LeakyRelu(0.02), (0.02,)), (Sigmoid(), ()), (Tanh(), ()), (Softmax(), ())]:
+            x = np.random.randn(6, 4)
+            grad = np.random.randn(6, 4)
+            x_copy, grad_copy = x.copy(), grad.copy()
+
+            layer.forward(x, training=True)
+            out = layer.backward(grad)
+
+            expected = (layer.f_prime(x, argv) if argv else layer.f_prime(x)) * grad
+
+            np.testing.assert_allclose(out, expected, err_msg=type(layer).__name__)
+            np.testing.assert_array_equal(x, x_copy)
+            np.testing.assert_array_equal(grad, grad_copy)
+
+    def test_cache(self):
+        """Tests that only a mask or outputs are kept, and that the gradient buffer is reused"""
+
+        x = np.random.randn(6, 4)
+
+        relu = Relu()
+        relu.forward(x, training=True)
+        self.assertIsNone(relu.inputs)
+        self.assertEqual(relu.mask.dtype, np.bool_)
+
+        tanh = Tanh()
+        outputs = tanh.forward(x, training=True)
+        self.assertIsNone(tanh.inputs)
+        self.assertIs(tanh.outputs, outputs)
+
+        first = tanh.backward(np.ones_like(x))
+        tanh.forward(x, training=True)
+        self.assertIs(tanh.backward(np.ones_like(x)), first)
+
+        tanh.forward(x)
+        self.assertIsNone(tanh.outputs)
+
+    def test_debug(self):
+        """Tests that nan and inf are replaced only in debug mode"""
+
+        relu = Relu()
+        relu.forward(np.ones((1, 2)), training=True)
+        grad = np.array([[np.nan, np.inf]])
+
+        self.assertFalse(np.all(np.isfinite(relu.backward(grad))))
+
+        Activation.debug = True
+        try:
+            self.assertTrue(np.all(np.isfinite(relu.backward(grad))))
+        finally:
+            Activation.debug = False
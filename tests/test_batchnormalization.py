@@ -0,0 +1,102 @@
+import unittest
+
+import os
+import shutil
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.data import Batch
+
+from .test_helpers import grad_calc_input
+
+
+def train(net, x, steps=50):
+    for _ in range(steps):
+        net.step(Batch(x, np.zeros((len(x), 2))))
+
+
+class TestBatchNormalization(unittest.TestCase):
+
+    def test_forward(self):
+        """Tests that training output is normalized with batch statistics"""
+
+        batch = BatchNormalization()
+        batch.build(3)
+
+        x = np.random.randn(10, 3) * 5 + 2
+        a = batch.forward(x, training=True)
+
+        np.testing.assert_allclose(np.mean(a, axis=0), 0, atol=1e-8)
+        np.testing.assert_allclose(np.std(a, axis=0), 1, atol=1e-6)
+
+    def test_input_grad(self):
+        """Tests the input gradient, for dense and convolutional features"""
+
+        for shape in [(6, 3), (2, 3, 3, 2)]:
+            batch = BatchNormalization()
+            batch.build(shape[-1])
+            batch.params['w'] = np.random.randn(shape[-1])
+
+            diff = grad_calc_input(np.random.randn(*shape), batch)
+
+            self.assertLess(diff, 1e-6, shape)
+
+    def test_running_statistics(self):
+        """Tests that running statistics converge and are used when predicting"""
+
+        batch = BatchNormalization(momentum=0.5)
+        batch.build(2)
+
+        x = np.random.randn(100, 2) * 3 + 1
+        for _ in range(30):
+            batch.forward(x, training=True)
+
+        np.testing.assert_allclose(batch.buffers['mean'], np.mean(x, axis=0))
+        np.testing.assert_allclose(batch.buffers['var'], np.var(x, axis=0, ddof=1))
+
+        single = batch.forward(x[:1])
+        np.testing.assert_allclose(single, (x[:1] - np.mean(x, axis=0)) / np.std(x, axis=0, ddof=1), rtol=1e-6)
+
+    def test_fold(self):
+        """Tests that folded model predicts the same as the original one"""
+
+        for layers, shape in [
+            ([Input(4), Linear(3), BatchNormalization(), Linear(2)], (8, 4)),
+            ([Input(1), Conv2D(2), BatchNormalization(), Flatten((6, 6, 2)), Linear(2)], (8, 4, 4, 1))
+        ]:
+            net = NeuralNet(layers)
+            net.build()
+
+            x = np.random.randn(*shape)
+            train(net, x)
+
+            expected = net.predict(x)
+            net.fold_batch_norm()
+
+            self.assertFalse(any(isinstance(layer, BatchNormalization) for layer in net.layers))
+            np.testing.assert_allclose(net.predict(x), expected)
+
+            train(net, x, steps=1)
+
+    def test_save_load(self):
+        """Tests that running statistics are saved with the model"""
+
+        net = NeuralNet([Input(4), Linear(3), BatchNormalization(), Linear(2)])
+        net.build()
+        train(net, np.random.randn(8, 4))
+
+        os.makedirs('temp_batchnorm', exist_ok=True)
+        try:
+            net.save('temp_batchnorm', 'model')
+
+            loaded = NeuralNet([Input(4), Linear(3), BatchNormalization(), Linear(2)])
+            loaded.build()
+            loaded.load('temp_batchnorm/model.bb')
+        finally:
+            shutil.rmtree('temp_batchnorm')
+
+        np.testing.assert_array_equal(loaded.layers[2].buffers['mean'], net.layers[2].buffers['mean'])
+        np.testing.assert_array_equal(loaded.layers[2].buffers['var'], net.layers[2].buffers['var'])
@@ -6,7 +6,26 @@ from bluebird.layers import *
 from bluebird.nn import NeuralNet
 from bluebird.activations import *
 
-from .test_helpers import grad_calc_layers
+from .test_helpers import grad_calc_layers, grad_calc_input
+
+def conv_loop(conv, x):
+    """Reference convolution, one output pixel at a time"""
+    padded = conv.zero_padding(x) if conv.padding else x
+    (f, f, _, out_channels) = conv.params['w'].shape
+    n, height, width, _ = padded.shape
+    new_height = (height - f) // conv.stride + 1
+    new_width = (width - f) // conv.stride + 1
+
+    Z = np.zeros((n, new_height, new_width, out_channels))
+    for i in range(n):
+        for h in range(new_height):
+            for w in range(new_width):
+                for c in range(out_channels):
+                    v = h * conv.stride
+                    u = w * conv.stride
+                    slic = padded[i, v:v+f, u:u+f, :]
+                    Z[i, h, w, c] = np.sum(slic * conv.params['w'][:, :, :, c]) + conv.params['b'][0, 0, 0, c]
+    return Z
 
 class TestConv2D(unittest.TestCase):
 
@@ -20,6 +39,18 @@ class TestConv2D(unittest.TestCase):
         a = conv.forward(x)
 
         assert a.shape == (5, 6, 5, 3)
+
+    def test_forward_matches_loop(self):
+        """Test vectorized forward against the per pixel loop"""
+
+        for stride, padding in [(1, True), (2, True), (1, False), (2, False)]:
+            conv = Conv2D(4, kernel_size=3, stride=stride, padding=padding)
+            conv.build(2)
+            conv.params['b'] = np.random.randn(*conv.params['b'].shape)
+
+            x = np.random.randn(3, 7, 6, 2)
+
+            np.testing.assert_allclose(conv.forward(x), conv_loop(conv, x))
     
     def test_weight_grad(self):
         """Tests the input grad for Conv2D layer"""
@@ -40,4 +71,125 @@ class TestConv2D(unittest.TestCase):
         diff = grad_calc_layers(x, y, net)
 
         for key, val in diff.items():
-            assert val < 1e-6, f"Gradient of {key} not calculated properly"
\ No newline at end of file
+            assert val < 1e-6, f"Gradient of {key} not calculated properly"
+
+    def test_strided_weight_grad(self):
+        """Tests the weight grad for strided Conv2D layer"""
+
+        net = NeuralNet([
+            Input(2),
+            Conv2D(2, stride=2),
+            Tanh(),
+            Flatten((4, 4, 2)),
+            Dense(1, activation=Tanh())
+        ])
+        net.build()
+
+        x = np.random.randn(1, 5, 5, 2)
+        y = np.random.randn(1, 1)
+
+        diff = grad_calc_layers(x, y, net)
+
+        for key, val in diff.items():
+            assert val < 1e-6, f"Gradient of {key} not calculated properly"
+
+    def test_input_grad(self):
+        """Tests the input grad for Conv2D layer"""
+
+        for stride, padding in [(1, True), (2, True), (2, False), (3, False)]:
+            conv = Conv2D(3, stride=stride, padding=padding)
+            conv.build(2)
+
+            x = np.random.randn(2, 7, 8, 2)
+
+            diff = grad_calc_input(x, conv)
+
+            assert diff < 1e-7, f"Input gradient not calculated properly for stride={stride}, padding={padding}"
+
+    def test_algorithms(self):
+        """Tests that fft and winograd give the same output as im2col"""
+
+        for kernel_size, stride, padding in [(3, 1, True), (3, 1, False), (5, 2, True), (4, 3, False)]:
+            conv = Conv2D(4, kernel_size=kernel_size, stride=stride, padding=padding)
+            conv.build(2)
+            conv.params['b'] = np.random.randn(*conv.params['b'].shape)
+
+            x = np.random.randn(3, 9, 8, 2)
+            expected = conv.forward(x)
+
+            algos = ['fft', 'winograd'] if kernel_size == 3 and stride == 1 else ['fft']
+            for algo in algos:
+                conv.algo = algo
+                np.testing.assert_allclose(conv.forward(x), expected, atol=1e-10, err_msg=algo)
+
+    def test_auto(self):
+        """Tests that auto picks an algorithm once per input shape and backward still works"""
+
+        conv = Conv2D(3, algo='auto')
+        conv.build(2)
+
+        x = np.random.randn(2, 6, 6, 2)
+        a = conv.forward(x, training=True)
+
+        self.assertEqual(len(conv.algo_cache), 1)
+        self.assertIn(list(conv.algo_cache.values())[0], ('im2col', 'fft', 'winograd'))
+
+        conv.forward(x, training=True)
+        self.assertEqual(len(conv.algo_cache), 1)
+
+        self.assertEqual(conv.backward(np.ones(a.shape)).shape, x.shape)
+
+    def test_benchmark(self):
+        """Tests that every algorithm is warmed up, and the output of the fastest one is used"""
+
+        calls = []
+
+        class Counting(Conv2D):
+            def convolve(self, algo, padded, training=False):
+                calls.append(algo)
+                return super().convolve(algo, padded, training)
+
+        conv = Counting(3, algo='auto')
+        conv.build(2)
+
+        reference = Conv2D(3)
+        reference.build(2)
+        reference.params = conv.params
+
+        x = np.random.randn(2, 6, 6, 2)
+        grad = np.random.randn(2, 8, 8, 3)
+
+        a = conv.forward(x, training=True)
+
+        self.assertEqual(len(calls), 3 * 4)
+        for algo in ('im2col', 'fft', 'winograd'):
+            self.assertEqual(calls.count(algo), 4)
+
+        np.testing.assert_allclose(a, reference.forward(x, training=True), atol=1e-10)
+        np.testing.assert_allclose(conv.backward(grad), reference.backward(grad), atol=1e-10)
+
+    def test_invalid_algo(self):
+        """Tests that invalid algorithm choices raise an error"""
+
+        with self.assertRaises(ValueError):
+            Conv2D(3, algo='direct')
+
+        with self.assertRaises(ValueError):
+            Conv2D(3, kernel_size=5, algo='winograd')
+
+    def test_padding_workspace(self):
+        """Tests that padded buffer is reused between training batches of same shape"""
+
+        conv = Conv2D(3)
+        conv.build(2)
+
+        x1 = np.random.randn(2, 5, 5, 2)
+        x2 = np.random.randn(2, 5, 5, 2)
+
+        conv.forward(x1, training=True)
+        padded = conv.padded
+        a = conv.forward(x2, training=True)
+
+        self.assertIs(conv.padded, padded)
+        self.assertEqual(len(conv.workspace), 1)
+        np.testing.assert_allclose(a, conv_loop(conv, x2))
@@ -0,0 +1,58 @@
+import unittest
+
+import threading
+
+import numpy as np
+
+from bluebird.dataloader import DataLoader
+
+
+class TestDataLoader(unittest.TestCase):
+
+    def test_prefetch_order(self):
+        """Tests that background loading yields batches in the same order as loading in place"""
+
+        x = np.arange(100).reshape(50, 2)
+        y = np.arange(50).reshape(50, 1)
+
+        sync = DataLoader(x, y, batch_size=4, seed=7)
+        prefetched = DataLoader(x, y, batch_size=4, seed=7, num_workers=3, prefetch=4)
+
+        batches = list(sync())
+        prefetched_batches = list(prefetched())
+
+        self.assertEqual(len(batches), 13)
+        self.assertEqual(len(batches), len(prefetched_batches))
+
+        for a, b in zip(batches, prefetched_batches):
+            np.testing.assert_array_equal(a.inputs, b.inputs)
+            np.testing.assert_array_equal(a.targets, b.targets)
+
+    def test_seed(self):
+        """Tests that same seed gives the same shuffle"""
+
+        x = np.arange(64).reshape(64, 1)
+
+        first = [b.inputs[0, 0] for b in DataLoader(x, x, batch_size=4, seed=3)()]
+        second = [b.inputs[0, 0] for b in DataLoader(x, x, batch_size=4, seed=3)()]
+
+        self.assertEqual(first, second)
+        self.assertEqual(sorted(first), list(range(0, 64, 4)))
+
+    def test_prefetch_overlap(self):
+        """Tests that the next batch is loading while the current one is used, even with prefetch=1"""
+
+        loaded = threading.Event()
+
+        class Loader(DataLoader):
+            def __getitem__(self, idx):
+                if idx == 4:
+                    loaded.set()
+                return super().__getitem__(idx)
+
+        x = np.arange(8).reshape(8, 1)
+        batches = Loader(x, x, batch_size=4, shuffle=False, num_workers=1, prefetch=1)()
+
+        next(batches)
+        self.assertTrue(loaded.wait(1))
+        self.assertEqual(len(list(batches)), 1)
@@ -68,3 +68,24 @@ def grad_calc_layers(x, y, net, eps=1e-8):
 
                 tests[par] = g
     return tests
+
+def grad_calc_input(x, layer, eps=1e-6):
+    out = layer.forward(x, training=True)
+    upstream = np.random.randn(*out.shape)
+    grad = layer.backward(upstream)
+
+    approx = np.zeros(x.shape)
+    flat = approx.reshape(-1)
+    for i in range(x.size):
+        xp = np.copy(x).reshape(-1)
+        xm = np.copy(x).reshape(-1)
+        xp[i] += eps
+        xm[i] -= eps
+        p = np.sum(layer.forward(xp.reshape(x.shape), training=True) * upstream)
+        m = np.sum(layer.forward(xm.reshape(x.shape), training=True) * upstream)
+        flat[i] = (p - m) / (2 * eps)
+
+    num = np.linalg.norm(approx - grad)
+    denum = np.linalg.norm(approx) + np.linalg.norm(grad)
+
+    return num / denum
@@ -50,4 +50,14 @@ class TestImageLoader(unittest.TestCase):
         loader = ImageLoader('temp', np.random.randn(128, 1), batch_size=16, im_shape=(16, 16))
         for batch in loader():
             self.assertEqual(batch.inputs.shape, (16, 16, 16, 3))
-            self.assertEqual(batch.targets.shape, (16, 1))
\ No newline at end of file
+            self.assertEqual(batch.targets.shape, (16, 1))
+
+    def test_prefetch(self):
+        """Tests ImageLoader when images are loaded in background threads"""
+        loader = ImageLoader('temp', np.random.randn(128, 1), batch_size=16, num_workers=4, prefetch=4)
+        count = 0
+        for batch in loader():
+            count += 1
+            self.assertEqual(batch.inputs.shape, (16, 32, 32, 3))
+            self.assertEqual(batch.targets.shape, (16, 1))
+        self.assertEqual(count, 8)
@@ -52,4 +52,95 @@ class TestLinear(unittest.TestCase):
 
 
 
-        
\ No newline at end of file
+        
+class TestDropout(unittest.TestCase):
+
+    def test_forward(self):
+        """Tests that inputs are dropped with given rate and kept ones are scaled"""
+
+        dropout = Dropout(3, 0.25, seed=0)
+        dropout.build(1000)
+
+        x = np.ones((50, 1000))
+        dropout.forward(x, training=True)
+
+        self.assertAlmostEqual(np.mean(dropout.inputs == 0), 0.25, places=2)
+        np.testing.assert_allclose(dropout.inputs[dropout.inputs != 0], 1 / 0.75)
+        np.testing.assert_array_equal(dropout.forward(x), x @ dropout.params['w'] + dropout.params['b'])
+
+    def test_backward(self):
+        """Tests that backward uses the mask of forward pass"""
+
+        dropout = Dropout(3, 0.5, seed=0)
+        dropout.build(6)
+
+        x = np.random.randn(4, 6)
+        a = dropout.forward(x, training=True)
+        grad = np.random.randn(*a.shape)
+
+        np.testing.assert_allclose(dropout.backward(grad), grad @ dropout.params['w'].T * dropout.mask)
+        np.testing.assert_allclose(dropout.grads['w'], (x * dropout.mask).T @ grad)
+
+    def test_spatial(self):
+        """Tests that spatial dropout drops whole channels"""
+
+        dropout = SpatialDropout(0.5, seed=0)
+        dropout.build(8)
+
+        x = np.random.randn(4, 5, 5, 8)
+        a = dropout.forward(x, training=True)
+
+        self.assertEqual(dropout.mask.shape, (4, 1, 1, 8))
+        self.assertTrue(np.any(dropout.mask == 0))
+        np.testing.assert_allclose(a, x * np.where(dropout.mask == 0, 0, 2))
+
+        np.testing.assert_array_equal(dropout.backward(np.ones_like(x)), np.broadcast_to(dropout.mask, x.shape))
+        np.testing.assert_array_equal(dropout.forward(x), x)
+
+
+class TestDense(unittest.TestCase):
+
+    def test_fused(self):
+        """Tests that fused dense matches linear followed by its activation"""
+
+        for activation in [None, Relu(), LeakyRelu(0.02), Sigmoid(), Tanh(), Softmax(), Softplus()]:
+            dense = Dense(3, activation=activation)
+            dense.build(4)
+            dense.params['b'] += np.random.randn(3)
+
+            x = np.random.randn(5, 4)
+            grad = np.random.randn(5, 3)
+            name = type(activation).__name__
+
+            expected = np.dot(x, dense.params['w']) + dense.params['b']
+            if activation is not None:
+                expected = activation.f(expected, activation.argv) if activation.argv else activation.f(expected)
+
+            np.testing.assert_allclose(dense.forward(x), expected, err_msg=name)
+            np.testing.assert_allclose(dense.forward(x, training=True), expected, err_msg=name)
+
+            hidden = grad
+            if activation is not None:
+                linear = np.dot(x, dense.params['w']) + dense.params['b']
+                prime = activation.f_prime(linear, activation.argv) if activation.argv else activation.f_prime(linear)
+                hidden = grad * prime
+
+            np.testing.assert_allclose(dense.backward(grad), np.dot(hidden, dense.params['w'].T), err_msg=name)
+            np.testing.assert_allclose(dense.grads['w'], np.dot(x.T, hidden), err_msg=name)
+            np.testing.assert_allclose(dense.grads['b'], hidden.sum(axis=0), err_msg=name)
+
+    def test_workspace(self):
+        """Tests that buffers are reused during training, and that predicting allocates new outputs"""
+
+        dense = Dense(3, activation=Relu())
+        dense.build(4)
+        x = np.random.randn(5, 4)
+
+        outputs = dense.forward(x, training=True)
+        grad = dense.backward(np.ones((5, 3)))
+
+        self.assertIs(dense.forward(x, training=True), outputs)
+        self.assertIs(dense.backward(np.ones((5, 3))), grad)
+
+        self.assertIsNot(dense.forward(x), dense.forward(x))
+        self.assertIsNot(dense.forward(x[:2], training=True), outputs)
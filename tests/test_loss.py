@@ -0,0 +1,193 @@
+import unittest
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.activations.softmax import softmax
+from bluebird.loss import *
+from bluebird.data import Batch
+
+
+def one_hot(labels, classes):
+    targets = np.zeros((len(labels), classes))
+    targets[np.arange(len(labels)), labels] = 1
+    return targets
+
+
+class TestSoftmaxCrossEntropy(unittest.TestCase):
+
+    def test_loss(self):
+        """Tests that loss is cross entropy of softmax of logits"""
+
+        loss = SoftmaxCrossEntropy()
+
+        x = np.random.randn(6, 5)
+        y = one_hot(np.random.randint(0, 5, 6), 5)
+
+        expected = CategoricalCrossEntropy().loss(softmax(x), y)
+
+        self.assertAlmostEqual(loss.loss(x, y), expected, places=6)
+        np.testing.assert_allclose(loss.grad(x, y), softmax(x) - y, atol=1e-7)
+
+    def test_overwritten_logits(self):
+        """Tests that grad of a buffer overwritten after loss doesn't use the old softmax"""
+
+        loss = SoftmaxCrossEntropy()
+
+        x = np.random.randn(6, 5)
+        y = one_hot(np.random.randint(0, 5, 6), 5)
+
+        loss.loss(x, y)
+        x[...] = np.random.randn(6, 5)
+
+        np.testing.assert_allclose(loss.grad(x, y), softmax(x) - y, atol=1e-7)
+
+    def test_grad(self):
+        """Tests the gradient against numerical one"""
+
+        loss = SoftmaxCrossEntropy()
+
+        x = np.random.randn(3, 4)
+        y = np.random.dirichlet(np.ones(4), 3)
+        eps = 1e-6
+
+        approx = np.zeros_like(x)
+        for i in np.ndindex(x.shape):
+            xp = np.copy(x)
+            xm = np.copy(x)
+            xp[i] += eps
+            xm[i] -= eps
+            approx[i] = (loss.loss(xp, y) - loss.loss(xm, y)) / (2 * eps)
+
+        loss.loss(x, y)
+        np.testing.assert_allclose(loss.grad(x, y), approx, atol=1e-6)
+
+    def test_stability(self):
+        """Tests that large logits don't give nan or inf"""
+
+        loss = SoftmaxCrossEntropy()
+
+        x = np.array([[1000.0, -1000.0, 0.0], [-1e4, 1e4, 3.0]])
+        y = one_hot([1, 0], 3)
+
+        value = loss.loss(x, y)
+        grad = loss.grad(x, y)
+
+        self.assertTrue(np.isfinite(value))
+        self.assertAlmostEqual(value, 2000.0 + 2e4)
+        self.assertTrue(np.all(np.isfinite(grad)))
+
+    def test_training(self):
+        """Tests that a model outputting logits learns"""
+
+        net = NeuralNet([
+            Input(4),
+            Dense(16, activation=Tanh()),
+            Dense(3)
+        ])
+        net.build(loss=SoftmaxCrossEntropy())
+
+        x = np.random.randn(30, 4)
+        y = one_hot(np.argmax(x[:, :3], axis=1), 3)
+
+        first = net.step(Batch(x, y))
+        for _ in range(100):
+            last = net.step(Batch(x, y))
+
+        self.assertLess(last, first)
+
+    def test_labels(self):
+        """Tests that class indices give the same result as one-hot targets"""
+
+        loss = SoftmaxCrossEntropy()
+
+        x = np.random.randn(6, 5)
+        labels = np.random.randint(0, 5, 6).astype(np.uint8)
+
+        self.assertAlmostEqual(loss.loss(x, labels), loss.loss(x, one_hot(labels, 5)))
+        np.testing.assert_allclose(loss.grad(x, labels), loss.grad(x, one_hot(labels, 5)))
+
+
+class TestSparseCategoricalCrossEntropy(unittest.TestCase):
+
+    def test_one_hot(self):
+        """Tests that class indices give the same result as one-hot targets"""
+
+        sparse = SparseCategoricalCrossEntropy()
+        dense = CategoricalCrossEntropy()
+
+        x = softmax(np.random.randn(6, 5))
+        labels = np.random.randint(0, 5, 6).astype(np.uint8)
+
+        self.assertAlmostEqual(sparse.loss(x, labels), dense.loss(x, one_hot(labels, 5)))
+        np.testing.assert_allclose(sparse.grad(x, labels), dense.grad(x, one_hot(labels, 5)))
+        np.testing.assert_allclose(sparse.grad(x, labels[:, np.newaxis]), dense.grad(x, one_hot(labels, 5)))
+
+    def test_training(self):
+        """Tests that a model learns from integer labels"""
+
+        net = NeuralNet([
+            Input(4),
+            Dense(16, activation=Tanh()),
+            Dense(3, activation=Softmax())
+        ])
+        net.build(loss=SparseCategoricalCrossEntropy())
+
+        x = np.random.randn(30, 4)
+        y = np.argmax(x[:, :3], axis=1).astype(np.uint8)
+
+        first = net.step(Batch(x, y))
+        for _ in range(100):
+            last = net.step(Batch(x, y))
+
+        self.assertLess(last, first)
+
+
+class TestLossAndGrad(unittest.TestCase):
+
+    def test_losses(self):
+        """Tests that loss_and_grad matches separate loss and grad, and reuses its buffer"""
+
+        logits = np.random.randn(6, 5)
+        probabilities = softmax(logits)
+        labels = np.random.randint(0, 5, 6)
+
+        cases = [
+            (MSE(), np.random.randn(6, 5), np.random.randn(6, 5)),
+            (CategoricalCrossEntropy(), probabilities, one_hot(labels, 5)),
+            (SparseCategoricalCrossEntropy(), probabilities, labels),
+            (SoftmaxCrossEntropy(), logits, one_hot(labels, 5)),
+            (SoftmaxCrossEntropy(), logits, labels)
+        ]
+
+        for loss, predicted, actual in cases:
+            name = type(loss).__name__
+            expected_loss = loss.loss(predicted, actual)
+            expected_grad = loss.grad(predicted, actual)
+
+            value, grad = loss.loss_and_grad(predicted, actual)
+            self.assertAlmostEqual(value, expected_loss, msg=name)
+            np.testing.assert_allclose(grad, expected_grad, err_msg=name)
+
+            _, again = loss.loss_and_grad(predicted, actual)
+            self.assertIs(again, grad, name)
+
+    def test_default(self):
+        """Tests that custom losses without loss_and_grad still work"""
+
+        class Absolute(Loss):
+            def loss(self, predicted, actual):
+                return np.sum(np.abs(predicted - actual))
+
+            def grad(self, predicted, actual):
+                return np.sign(predicted - actual)
+
+        x = np.random.randn(4, 2)
+        y = np.random.randn(4, 2)
+
+        value, grad = Absolute().loss_and_grad(x, y)
+
+        self.assertEqual(value, np.sum(np.abs(x - y)))
+        np.testing.assert_array_equal(grad, np.sign(x - y))
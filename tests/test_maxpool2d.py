@@ -6,6 +6,8 @@ from bluebird.layers import *
 from bluebird.nn import NeuralNet
 from bluebird.activations import *
 
+from .test_helpers import grad_calc_input
+
 
 class TestMaxPool2D(unittest.TestCase):
 
@@ -19,15 +21,29 @@ class TestMaxPool2D(unittest.TestCase):
 
         assert a.shape == (5, 2, 3, 3)
     
-    # def test_weight_grad(self):
-    #     """Tests the input grad for MaxPool2D layer"""
+    def test_forward_matches_loop(self):
+        """Test forward propagation for MaxPool2D against per window max"""
+
+        for f, stride in [(3, None), (2, 1), (3, 2)]:
+            pool = MaxPool2D(kernel_size=f, stride=stride)
+            s = pool.stride
+
+            x = np.random.randn(2, 7, 8, 3)
+            a = pool.forward(x)
+
+            for h in range(a.shape[1]):
+                for w in range(a.shape[2]):
+                    window = x[:, h*s:h*s+f, w*s:w*s+f, :]
+                    np.testing.assert_array_equal(a[:, h, w, :], window.max(axis=(1, 2)))
+
+    def test_input_grad(self):
+        """Tests the input grad for MaxPool2D layer"""
 
-    #     layer = MaxPool2D(kernel_size=3)
+        for f, stride in [(3, None), (2, 1), (3, 2)]:
+            layer = MaxPool2D(kernel_size=f, stride=stride)
 
-    #     x = np.random.randn(5, 6, 9, 3)
+            x = np.random.randn(2, 6, 9, 3)
 
-    #     diff = grad_calc(x, layer)
-    #     print(diff)
+            diff = grad_calc_input(x, layer)
 
-    #     for key, val in diff.items():
-    #         assert val < 1e-7, "Gradient of " + key + " not calculated properly"
\ No newline at end of file
+            assert diff < 1e-7, f"Gradient not calculated properly for kernel_size={f}, stride={stride}"
@@ -0,0 +1,296 @@
+import unittest
+
+import os
+import json
+import shutil
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.optimizers import *
+from bluebird.data import Batch
+
+
+def make_net(dtype=np.float64):
+    net = NeuralNet([
+        Input(1),
+        Conv2D(2),
+        MaxPool2D(kernel_size=2),
+        Flatten((3, 3, 2)),
+        Dense(4, activation=Relu()),
+        BatchNormalization(),
+        Linear(2)
+    ], dtype=dtype)
+    net.build()
+    return net
+
+
+class TestDtype(unittest.TestCase):
+
+    def test_float32(self):
+        """Tests that float32 model stays float32 during training and predicting"""
+
+        for optimizer in [SGD(), Adam(), AdaGrad(), NestovMomentum()]:
+            net = NeuralNet([
+                Input(1),
+                Conv2D(2),
+                Flatten((6, 6, 2)),
+                Dense(4, activation=Relu()),
+                BatchNormalization(),
+                Linear(2)
+            ], dtype=np.float32)
+            net.build(optimizer=optimizer)
+
+            x = np.random.randn(5, 4, 4, 1)
+            y = np.random.randn(5, 2)
+
+            net.step(Batch(x, y))
+
+            for layer in net.layers:
+                for key in layer.params:
+                    self.assertEqual(layer.params[key].dtype, np.float32, f"{type(layer).__name__} {key}")
+                    self.assertEqual(layer.grads[key].dtype, np.float32, f"{type(layer).__name__} {key}")
+
+            self.assertEqual(net.predict(x).dtype, np.float32)
+
+    def test_conv_algorithms(self):
+        """Tests that every convolution algorithm keeps float32"""
+
+        for algo in ['im2col', 'fft', 'winograd']:
+            conv = Conv2D(2, algo=algo)
+            conv.build(3)
+            conv.params['w'] = conv.params['w'].astype(np.float32)
+            conv.params['b'] = conv.params['b'].astype(np.float32)
+
+            a = conv.forward(np.random.randn(2, 5, 5, 3).astype(np.float32), training=True)
+
+            self.assertEqual(a.dtype, np.float32, algo)
+            self.assertEqual(conv.backward(np.ones_like(a)).dtype, np.float32, algo)
+
+
+class TestSaveLoad(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        if not os.path.exists('temp_model'):
+            os.mkdir('temp_model')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree('temp_model')
+
+    def test_save_load(self):
+        """Tests that loaded params are the same Tensors that were saved"""
+
+        net = make_net()
+        net.save('temp_model', 'model')
+
+        loaded = make_net()
+        weights = loaded.layers[1].params['w']
+        loaded.load('temp_model/model.bb')
+
+        self.assertIs(loaded.layers[1].params['w'], weights)
+
+        for layer, loaded_layer in zip(net.layers, loaded.layers):
+            for key, value in layer.params.items():
+                self.assertIsInstance(loaded_layer.params[key], np.ndarray)
+                self.assertEqual(loaded_layer.params[key].dtype, value.dtype)
+                np.testing.assert_array_equal(loaded_layer.params[key], value)
+
+        x = np.random.randn(3, 4, 4, 1)
+        np.testing.assert_array_equal(net.predict(x), loaded.predict(x))
+
+    def test_load_json(self):
+        """Tests loading of models saved as json"""
+
+        net = make_net()
+        data = {'layers': [
+            {type(layer).__name__: [{'name': k, 'value': v.tolist()} for k, v in layer.params.items()]}
+            for layer in net.layers
+        ]}
+
+        with open('temp_model/model.json', 'w') as f:
+            json.dump(data, f)
+
+        loaded = make_net()
+        loaded.load('temp_model/model.json')
+
+        for layer, loaded_layer in zip(net.layers, loaded.layers):
+            for key, value in layer.params.items():
+                self.assertIsInstance(loaded_layer.params[key], np.ndarray)
+                np.testing.assert_array_equal(loaded_layer.params[key], value)
+
+    def test_load_mmap(self):
+        """Tests that params loaded with mmap are read-only and give the same predictions"""
+
+        net = make_net()
+        net.save('temp_model', 'mapped')
+
+        loaded = make_net()
+        loaded.load('temp_model/mapped.bb', mmap=True)
+
+        weights = loaded.layers[1].params['w']
+        self.assertFalse(weights.flags.writeable)
+
+        x = np.random.randn(3, 4, 4, 1)
+        np.testing.assert_array_equal(net.predict(x), loaded.predict(x))
+
+    def test_load_mmap_unbuilt(self):
+        """Tests mmap loading into a model that isn't built, and that a built one releases its training buffers"""
+
+        net = make_net()
+        net.save('temp_model', 'mapped')
+
+        layers = [
+            Input(1),
+            Conv2D(2),
+            MaxPool2D(kernel_size=2),
+            Flatten((3, 3, 2)),
+            Dense(4, activation=Relu()),
+            BatchNormalization(),
+            Linear(2)
+        ]
+
+        unbuilt = NeuralNet(layers)
+        unbuilt.load('temp_model/mapped.bb', mmap=True)
+
+        built = make_net()
+        built.load('temp_model/mapped.bb', mmap=True)
+
+        self.assertFalse(hasattr(built, 'flat_params'))
+        self.assertFalse(hasattr(built, 'optimizer'))
+        self.assertEqual(built.layers[4].grads, {})
+
+        x = np.random.randn(3, 4, 4, 1)
+        for loaded in [unbuilt, built]:
+            self.assertFalse(loaded.layers[4].params['w'].flags.writeable)
+            np.testing.assert_array_equal(net.predict(x), loaded.predict(x))
+
+    def test_save_mmap(self):
+        """Tests that a model loaded with mmap can be saved back to its own file"""
+
+        net = make_net()
+        net.save('temp_model', 'mapped')
+
+        loaded = make_net()
+        loaded.load('temp_model/mapped.bb', mmap=True)
+        loaded.save('temp_model', 'mapped')
+
+        x = np.random.randn(3, 4, 4, 1)
+        np.testing.assert_array_equal(net.predict(x), loaded.predict(x))
+
+        reloaded = make_net()
+        reloaded.load('temp_model/mapped.bb')
+        np.testing.assert_array_equal(net.predict(x), reloaded.predict(x))
+        self.assertFalse(os.path.exists('temp_model/mapped.bb.tmp'))
+
+    def test_save_missing_directory(self):
+        """Tests that saving into a missing directory raises the error of open"""
+
+        with self.assertRaises(FileNotFoundError) as context:
+            make_net().save('temp_model/missing', 'model')
+
+        # error of removing the temporary file would be raised while handling the original one
+        self.assertIsNone(context.exception.__context__)
+
+    def test_save_load_optimizer(self):
+        """Tests that training resumed from a checkpoint with optimizer state continues the same way"""
+
+        batch = Batch(np.random.randn(4, 4, 4, 1), np.random.randn(4, 2))
+
+        net = make_net()
+        net.build(optimizer=Adam(lr=0.01))
+        net.step(batch)
+        net.save('temp_model', 'resumed', optimizer=True)
+
+        loaded = make_net()
+        loaded.build(optimizer=Adam(lr=0.01))
+        loaded.load('temp_model/resumed.bb', optimizer=True)
+
+        self.assertEqual(loaded.optimizer.t, 1)
+
+        net.step(batch)
+        loaded.step(batch)
+
+        np.testing.assert_array_equal(net.flat_params, loaded.flat_params)
+
+
+class TestPredict(unittest.TestCase):
+
+    def test_batch_size(self):
+        """Tests that predicting in chunks gives the same result as predicting all at once"""
+
+        net = make_net()
+        x = np.random.randn(10, 4, 4, 1)
+        expected = net.predict(x)
+
+        for batch_size in [1, 3, 10, 32]:
+            np.testing.assert_allclose(net.predict(x, batch_size=batch_size), expected)
+
+        with self.assertRaises(ValueError):
+            net.predict(x, batch_size=0)
+
+    def test_out(self):
+        """Tests that predictions are written into given array, which can be memory mapped"""
+
+        net = make_net()
+        x = np.random.randn(10, 4, 4, 1)
+        expected = net.predict(x)
+
+        os.makedirs('temp_predict', exist_ok=True)
+        try:
+            out = np.lib.format.open_memmap('temp_predict/out.npy', mode='w+', dtype=np.float64, shape=(10, 2))
+            result = net.predict(x, batch_size=4, out=out)
+
+            self.assertIs(result, out)
+            out.flush()
+            np.testing.assert_allclose(np.load('temp_predict/out.npy'), expected)
+            del out, result
+        finally:
+            shutil.rmtree('temp_predict')
+
+    def test_no_cached_state(self):
+        """Tests that layers don't keep activations after predicting"""
+
+        net = make_net()
+        x = np.random.randn(3, 4, 4, 1)
+
+        net.step(Batch(x, np.random.randn(3, 2)))
+        net.predict(x)
+
+        for layer in net.layers:
+            for name in ['inputs', 'outputs', 'padded', 'cols', 'argmax', 'norm']:
+                self.assertIsNone(getattr(layer, name, None), f"{type(layer).__name__}.{name}")
+
+        self.assertIsNone(net.layers[4].hidden.inputs)
+
+    def test_predict_iter(self):
+        """Tests that batches of a loader are predicted in order"""
+
+        from bluebird.dataloader import DataLoader
+
+        net = make_net()
+        x = np.random.randn(10, 4, 4, 1)
+        loader = DataLoader(x, np.zeros((10, 2)), batch_size=4, shuffle=False)
+
+        predicted = list(net.predict_iter(loader))
+
+        self.assertEqual([len(p) for p in predicted], [4, 4, 2])
+        np.testing.assert_allclose(np.concatenate(predicted), net.predict(x))
+
+    def test_threads(self):
+        """Tests that one model can predict from many threads at once"""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        net = make_net()
+        inputs = [np.random.randn(16, 4, 4, 1) for _ in range(64)]
+        expected = [net.predict(x) for x in inputs]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(net.predict, inputs))
+
+        for result, value in zip(results, expected):
+            np.testing.assert_array_equal(result, value)
@@ -0,0 +1,231 @@
+import unittest
+import os
+import shutil
+import tracemalloc
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.optimizers import *
+from bluebird.data import Batch
+
+
+def make_net(optimizer):
+    net = NeuralNet([
+        Input(1),
+        Conv2D(2),
+        MaxPool2D(kernel_size=2),
+        Flatten((3, 3, 2)),
+        Dense(4, activation=Tanh()),
+        BatchNormalization(),
+        Linear(2)
+    ])
+    net.build(optimizer=optimizer)
+    return net
+
+
+def reference_step(name, params, grads, state, t, lr):
+    """Per tensor updates, as written in the papers"""
+    for i, (p, g) in enumerate(zip(params, grads)):
+        s = state.setdefault(i, {'m': np.zeros_like(p), 'v': np.zeros_like(p)})
+        if name == 'sgd':
+            p -= lr * g
+        elif name == 'adagrad':
+            s['v'] += g ** 2
+            p -= lr * g / np.sqrt(s['v'] + 1e-8)
+        elif name in ('adam', 'adamw', 'amsgrad'):
+            if name == 'adamw':
+                p *= 1 - lr * 0.01
+            s['m'] = 0.9 * s['m'] + 0.1 * g
+            s['v'] = 0.999 * s['v'] + 0.001 * g ** 2
+            v = s['v']
+            if name == 'amsgrad':
+                s['vmax'] = np.maximum(s.get('vmax', v), v)
+                v = s['vmax']
+            p -= lr * (s['m'] / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + 1e-8)
+        elif name == 'nestov':
+            v_prev = np.copy(s['v'])
+            s['v'] = 0.9 * s['v'] - lr * g
+            p += -0.9 * v_prev + 1.9 * s['v']
+
+
+class TestFlatBuffers(unittest.TestCase):
+
+    def test_views(self):
+        """Tests that params and grads are views of the flat buffers"""
+
+        net = make_net(SGD())
+
+        for param, grad in net.get_params_and_grads():
+            self.assertTrue(np.shares_memory(param, net.flat_params))
+            self.assertTrue(np.shares_memory(grad, net.flat_grads))
+
+        self.assertEqual(net.flat_params.size, sum(p.size for p, _ in net.get_params_and_grads()))
+
+    def test_optimizers(self):
+        """Tests that updates of flat buffers are the same as per tensor updates"""
+
+        optimizers = {
+            'sgd': SGD(lr=0.01),
+            'adagrad': AdaGrad(lr=0.01),
+            'adam': Adam(lr=0.01),
+            'adamw': AdamW(lr=0.01, weight_decay=0.01),
+            'amsgrad': Adam(lr=0.01, amsgrad=True),
+            'nestov': NestovMomentum(lr=0.01)
+        }
+
+        for name, optimizer in optimizers.items():
+            net = make_net(optimizer)
+            params = [np.copy(p) for p, _ in net.get_params_and_grads()]
+            state = {}
+
+            for t in range(1, 4):
+                x = np.random.randn(4, 4, 4, 1)
+                y = np.random.randn(4, 2)
+
+                net.compute_grads(Batch(x, y))
+                grads = [np.copy(g) for _, g in net.get_params_and_grads()]
+
+                net.optimizer.step()
+                reference_step(name, params, grads, state, t, 0.01)
+
+                for (p, _), expected in zip(net.get_params_and_grads(), params):
+                    np.testing.assert_allclose(p, expected, err_msg=name)
+
+    def test_allocations(self):
+        """Tests that steps don't allocate memory the size of params"""
+
+        for optimizer in [SGD(), AdaGrad(), NestovMomentum(), Adam(), AdamW(), Adam(amsgrad=True)]:
+            net = NeuralNet([Input(100), Linear(100)])
+            net.build(optimizer=optimizer)
+            net.compute_grads(Batch(np.random.randn(4, 100), np.random.randn(4, 100)))
+            net.optimizer.step()
+
+            tracemalloc.start()
+            net.optimizer.step()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.assertLess(peak, net.flat_params.nbytes // 10)
+
+
+class TestState(unittest.TestCase):
+
+    def test_lazy(self):
+        """Tests that state is created on first step, and only the state optimizer uses"""
+
+        net = make_net(Adam())
+        self.assertEqual(net.optimizer.state, {})
+
+        net.step(Batch(np.random.randn(4, 4, 4, 1), np.random.randn(4, 2)))
+        self.assertEqual(set(net.optimizer.state), {'m', 'v'})
+
+    def test_state_dict(self):
+        """Tests that state is keyed by param names"""
+
+        net = make_net(Adam())
+        net.step(Batch(np.random.randn(4, 4, 4, 1), np.random.randn(4, 2)))
+        state = net.optimizer.state_dict()
+
+        self.assertIn('1.w/m', state)
+        self.assertIn('6.b/v', state)
+        self.assertEqual(state['1.w/m'].shape, (net.layers[1].params['w'].size,))
+        self.assertFalse(any(key.startswith('2.') for key in state))
+
+        loaded = make_net(Adam())
+        loaded.optimizer.load_state_dict({'1.w/m': state['1.w/m'], 'missing.w/m': np.ones(3), 't': state['t']})
+
+        np.testing.assert_array_equal(loaded.optimizer.state_dict()['1.w/m'], state['1.w/m'])
+        np.testing.assert_array_equal(loaded.optimizer.state_dict()['6.b/m'], 0)
+        self.assertEqual(loaded.optimizer.t, 1)
+
+    def test_missing_grads(self):
+        """Tests that params without a gradient get a zero gradient"""
+
+        class Frozen(Linear):
+            def backward(self, grad):
+                grad = super().backward(grad)
+                self.grads['b'] = None
+                return grad
+
+        net = NeuralNet([Input(3), Frozen(2)])
+        net.build(optimizer=SGD(lr=0.1))
+        bias = np.copy(net.layers[1].params['b'])
+
+        for _ in range(2):
+            net.step(Batch(np.random.randn(4, 3), np.random.randn(4, 2)))
+
+        np.testing.assert_array_equal(net.layers[1].params['b'], bias)
+        self.assertIs(net.layers[1].grads['b'], net.grad_views[1][2])
+
+
+class TestMixedPrecision(unittest.TestCase):
+
+    def make_net(self, optimizer):
+        net = NeuralNet([
+            Input(4),
+            Dense(8, activation=Tanh()),
+            Linear(1)
+        ], dtype=np.float16)
+        net.build(optimizer=optimizer)
+        return net
+
+    def test_training(self):
+        """Tests that float16 model with float32 master weights learns"""
+
+        optimizer = MixedPrecision(SGD(lr=0.01), scale=2.0 ** 8)
+        net = self.make_net(optimizer)
+
+        x = np.random.randn(32, 4)
+        y = x.sum(axis=1, keepdims=True) * 0.1
+
+        first = net.step(Batch(x, y))
+        for _ in range(100):
+            last = net.step(Batch(x, y))
+
+        self.assertLess(last, first)
+
+        for (param, grad), (master, _) in zip(net.get_params_and_grads(), optimizer.master.get_params_and_grads()):
+            self.assertEqual(param.dtype, np.float16)
+            self.assertEqual(grad.dtype, np.float16)
+            self.assertEqual(master.dtype, np.float32)
+            np.testing.assert_array_equal(param, master.astype(np.float16))
+
+    def test_overflow(self):
+        """Tests that overflowing step is skipped and the scale lowered"""
+
+        optimizer = MixedPrecision(SGD(lr=0.01), scale=2.0 ** 15)
+        net = self.make_net(optimizer)
+
+        x = np.random.randn(32, 4) * 100
+        y = np.ones((32, 1)) * 1000
+
+        weights = np.copy(net.layers[1].params['w'])
+        net.step(Batch(x, y))
+
+        self.assertEqual(optimizer.skipped, 1)
+        self.assertEqual(optimizer.scale, 2.0 ** 14)
+        np.testing.assert_array_equal(net.layers[1].params['w'], weights)
+
+    def test_load(self):
+        """Tests that master weights follow params loaded into a built model"""
+
+        net = self.make_net(MixedPrecision(SGD(lr=0.01), scale=1.0))
+        net.step(Batch(np.random.randn(8, 4), np.random.randn(8, 1)))
+
+        optimizer = MixedPrecision(SGD(lr=0.0), scale=1.0)
+        loaded = self.make_net(optimizer)
+
+        os.makedirs('temp_mixed', exist_ok=True)
+        try:
+            net.save('temp_mixed', 'model')
+            loaded.load('temp_mixed/model.bb')
+        finally:
+            shutil.rmtree('temp_mixed')
+
+        loaded.step(Batch(np.random.randn(8, 4), np.random.randn(8, 1)))
+
+        self.assertEqual(optimizer.skipped, 0)
+        np.testing.assert_array_equal(loaded.flat_params, net.flat_params)
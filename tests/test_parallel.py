@@ -0,0 +1,127 @@
+import unittest
+import copy
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.optimizers import SGD, MixedPrecision
+from bluebird.dataloader import DataLoader
+from bluebird.parallel import DataParallel
+from bluebird.data import Batch
+
+
+class TestDataParallel(unittest.TestCase):
+
+    def test_same_as_single_process(self):
+        """Tests that training on several workers gives the same weights as a single process"""
+
+        net = NeuralNet([
+            Input(4),
+            Linear(3),
+            Tanh(),
+            Linear(1)
+        ])
+        net.build(optimizer=SGD(lr=0.01))
+
+        parallel_net = copy.deepcopy(net)
+        parallel_net.optimizer.net = parallel_net
+
+        x = np.random.randn(20, 4)
+        y = np.random.randn(20, 1)
+
+        net.fit(DataLoader(x, y, batch_size=8, shuffle=False), num_epochs=2)
+        parallel_net.fit(DataLoader(x, y, batch_size=8, shuffle=False), num_epochs=2, workers=3)
+
+        for layer, parallel_layer in zip(net.layers, parallel_net.layers):
+            for key in layer.params:
+                np.testing.assert_allclose(layer.params[key], parallel_layer.params[key])
+
+    def test_mixed_precision(self):
+        """Tests that workers scale the loss with the scale of the main process"""
+
+        net = NeuralNet([
+            Input(4),
+            Linear(3),
+            Tanh(),
+            Linear(1)
+        ], dtype=np.float16)
+        net.build(optimizer=MixedPrecision(SGD(lr=0.01), scale=2.0, growth_interval=1))
+
+        parallel_net = copy.deepcopy(net)
+        parallel_net.optimizer.net = parallel_net
+
+        x = np.random.randn(16, 4)
+        y = np.random.randn(16, 1)
+
+        net.fit(DataLoader(x, y, batch_size=8, shuffle=False), num_epochs=3)
+        parallel_net.fit(DataLoader(x, y, batch_size=8, shuffle=False), num_epochs=3, workers=2)
+
+        self.assertEqual(parallel_net.optimizer.scale, 2.0 ** 7)
+        np.testing.assert_allclose(parallel_net.flat_params, net.flat_params, rtol=1e-2, atol=1e-3)
+
+    def test_batch_normalization(self):
+        """Tests that running statistics of workers end up in the model"""
+
+        net = NeuralNet([
+            Input(4),
+            BatchNormalization(),
+            Linear(1)
+        ])
+        net.build(optimizer=SGD(lr=0.01))
+
+        parallel_net = copy.deepcopy(net)
+        parallel_net.optimizer.net = parallel_net
+
+        random = np.random.RandomState(0)
+        x = random.randn(64, 4) * 3 + 2
+        y = random.randn(64, 1)
+
+        net.fit(DataLoader(x, y, batch_size=32, shuffle=False), num_epochs=3)
+        parallel_net.fit(DataLoader(x, y, batch_size=32, shuffle=False), num_epochs=3, workers=2)
+
+        expected, actual = net.layers[1].buffers, parallel_net.layers[1].buffers
+
+        # halves of a batch have the same size, so the average of their means is the mean of the batch
+        np.testing.assert_allclose(actual['mean'], expected['mean'])
+        np.testing.assert_allclose(actual['var'], expected['var'], rtol=0.5)
+        self.assertFalse(np.allclose(actual['var'], 1))
+
+    def test_independent_workers(self):
+        """Tests that workers draw different dropout masks"""
+
+        np.random.seed(0)
+
+        net = NeuralNet([
+            Input(16),
+            Dropout(1, 0.5, seed=0)
+        ])
+        net.build(optimizer=SGD(lr=0.0))
+
+        parallel = DataParallel(net, workers=2)
+        parallel.start()
+        try:
+            parallel.step(Batch(np.ones((2, 16)), np.zeros((2, 1))))
+        finally:
+            parallel.close()
+
+        first, second = parallel.worker_grads
+        self.assertFalse(np.allclose(first, second))
+
+    def test_close_dead_worker(self):
+        """Tests that close stops every worker even if one of them died"""
+
+        net = NeuralNet([Input(4), Linear(1)])
+        net.build()
+
+        parallel = DataParallel(net, workers=2)
+        parallel.start()
+
+        processes = list(parallel.processes)
+        processes[0].kill()
+        processes[0].join()
+
+        parallel.close()
+
+        self.assertFalse(any(process.is_alive() for process in processes))
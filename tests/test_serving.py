@@ -0,0 +1,175 @@
+import unittest
+
+import asyncio
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from bluebird.layers import *
+from bluebird.nn import NeuralNet
+from bluebird.activations import *
+from bluebird.serving import MicroBatcher, InferenceServer, benchmark, read_message, write_message
+
+
+def make_net():
+    net = NeuralNet([
+        Input(4),
+        Dense(8, activation=Relu()),
+        Linear(3)
+    ])
+    net.build()
+    return net
+
+
+class TestServing(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_micro_batches(self):
+        """Tests that concurrent samples are predicted in batches"""
+
+        net = make_net()
+        x = np.random.randn(20, 4)
+
+        async def run():
+            batcher = MicroBatcher(net, max_batch_size=8, max_wait=0.05)
+            batcher.start()
+            results = await asyncio.gather(*(batcher.predict(sample) for sample in x))
+            await batcher.close()
+            return batcher, results
+
+        batcher, results = self.loop.run_until_complete(run())
+
+        np.testing.assert_allclose(np.stack(results), net.predict(x))
+        self.assertEqual(batcher.requests, 20)
+        self.assertEqual(batcher.batches, 3)
+
+    def test_server(self):
+        """Tests predictions and errors over HTTP"""
+
+        net = make_net()
+        x = np.random.randn(5, 4)
+
+        async def run():
+            server = InferenceServer(net, port=0, max_wait=0.01)
+            await server.start()
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+
+            outputs = []
+            for sample in x:
+                write_message(writer, "POST /predict HTTP/1.1", {'inputs': sample.tolist()})
+                status, _, body = await read_message(reader)
+                self.assertEqual(status, "HTTP/1.1 200 OK")
+                outputs.append(json.loads(body)['outputs'])
+
+            write_message(writer, "POST /predict HTTP/1.1", {'wrong': 1})
+            status, _, _ = await read_message(reader)
+            self.assertEqual(status, "HTTP/1.1 400 Bad Request")
+
+            write_message(writer, "GET / HTTP/1.1", {})
+            status, _, _ = await read_message(reader)
+            self.assertEqual(status, "HTTP/1.1 404 Not Found")
+
+            writer.close()
+            await server.close()
+            return outputs
+
+        outputs = self.loop.run_until_complete(run())
+
+        np.testing.assert_allclose(outputs, net.predict(x))
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "needs Unix sockets")
+    def test_benchmark(self):
+        """Tests the benchmark client over a Unix socket"""
+
+        net = make_net()
+        path = os.path.join(tempfile.mkdtemp(), 'bluebird.sock')
+
+        async def run():
+            server = InferenceServer(net, path=path, max_batch_size=16, max_wait=0.005)
+            await server.start()
+            stats = await benchmark(np.random.randn(10, 4), path=path, requests=100, concurrency=16)
+            await server.close()
+            return server, stats
+
+        server, stats = self.loop.run_until_complete(run())
+        os.remove(path)
+
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(server.batcher.requests, 100)
+        self.assertLess(server.batcher.batches, 100)
+        self.assertGreater(stats['throughput'], 0)
+
+    def test_benchmark_closed(self):
+        """Tests that connections closed by the server are counted as errors"""
+
+        async def close(reader, writer):
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(close, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            stats = await benchmark(np.random.randn(2, 4), port=port, requests=10, concurrency=2)
+            server.close()
+            await server.wait_closed()
+            return stats
+
+        stats = self.loop.run_until_complete(run())
+
+        self.assertEqual(stats['errors'], 2)
+        self.assertEqual(stats['requests'], 0)
+        self.assertEqual(stats['throughput'], 0)
+
+    def test_overload(self):
+        """Tests that requests over max_queue are rejected with 503"""
+
+        net = make_net()
+        body = json.dumps({'inputs': [0.0, 0.0, 0.0, 0.0]}).encode('utf-8')
+
+        async def run():
+            server = InferenceServer(net, port=0, max_batch_size=1, max_queue=1)
+            await server.start()
+            responses = await asyncio.gather(*(server.respond("POST /predict HTTP/1.1", body) for _ in range(3)))
+            await server.close()
+            return [status for status, _ in responses]
+
+        statuses = self.loop.run_until_complete(run())
+
+        self.assertIn('200 OK', statuses)
+        self.assertIn('503 Service Unavailable', statuses)
+
+    def test_bad_content_length(self):
+        """Tests that a malformed Content-Length is answered with 400"""
+
+        net = make_net()
+
+        async def run():
+            server = InferenceServer(net, port=0)
+            await server.start()
+
+            statuses = []
+            for length in ['abc', '-5']:
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(f"POST /predict HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode('latin-1'))
+                await writer.drain()
+
+                status, _, _ = await read_message(reader)
+                statuses.append(status)
+                self.assertIsNone(await read_message(reader))
+                writer.close()
+
+            await server.close()
+            return statuses
+
+        statuses = self.loop.run_until_complete(run())
+
+        self.assertEqual(statuses, ["HTTP/1.1 400 Bad Request"] * 2)